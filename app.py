@@ -1,10 +1,16 @@
 import streamlit as st
 import pandas as pd
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
 import plotly.express as px
+from pandas.api.types import union_categoricals
 from datetime import datetime
 import time
+import html
+import threading
+import atexit
+import os
+from ayarlar import ADMIN_SIFRE
+from depo import COL_FINANS, COL_LOG, COL_OGRENCI, COL_PROG, COL_ZIYARET, SADECE_EKLENEN, SEMALAR, AnlikDepo, SheetsDepo, SqliteDepo, ham_satir, kuyruk_baslangici, tablo_ac, yeni_satirlar
+from olcum import Olcum
 
 # --- AYARLAR ---
 st.set_page_config(page_title="Tennis App", page_icon="🎾", layout="wide")
@@ -42,79 +48,511 @@ st.markdown("""
     </style>
     """, unsafe_allow_html=True)
 
-# --- YÖNETİCİ ŞİFRESİ ---
-ADMIN_SIFRE = "1234"
-
 # --- GOOGLE SHEETS BAĞLANTISI ---
 @st.cache_resource
 def baglanti_kur():
-    scope = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
-    if "gcp_service_account" in st.secrets:
-        creds_dict = dict(st.secrets["gcp_service_account"])
-        if "private_key" in creds_dict: creds_dict["private_key"] = creds_dict["private_key"].replace("\\n", "\n")
-        creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, scope)
-    else:
-        creds = ServiceAccountCredentials.from_json_keyfile_name('secrets.json', scope)
-    client = gspread.authorize(creds)
-    return client.open("CourtMaster_DB")
+    return tablo_ac(st.secrets["gcp_service_account"] if "gcp_service_account" in st.secrets else 'secrets.json')
 
-# --- SÜTUN YAPILARI ---
-COL_OGRENCI = ["Ad Soyad", "Paket (Ders)", "Kalan Ders", "Son Islem", "Durum", "Odeme Durumu", "Notlar"]
-COL_FINANS = ["Tarih", "Ay", "Ogrenci", "Tutar", "Not", "Tip"]
-COL_LOG = ["Tarih", "Saat", "Ogrenci", "Islem", "Detay"]
-COL_PROG = ["Saat", "Pazartesi", "Salı", "Çarşamba", "Perşembe", "Cuma", "Cumartesi", "Pazar"]
+# --- SÜTUN TİPLERİ ---
+# Okurken uygulanır. Kategorilerde bilinen değerler her zaman tanımlıdır (atama hata vermesin),
+# veride geçen diğer değerler de eklenir. Zaman: sayfa başına tek, sıralamada kullanılan tarih-saat sütunu.
+KATEGORILER = {"Durum": ["Aktif", "Bitti", "Donduruldu"], "Odeme Durumu": ["Ödendi", "Ödenmedi"], "Tip": ["Gelir", "Gider"], "Ogrenci": []}
+TAMSAYILAR = {"Paket (Ders)": "int32", "Kalan Ders": "int32", "Ziyaret": "int32"}
+INT32_SINIRI = (-2**31, 2**31 - 1)  # elle girilmiş aşırı değerler taşmasın, sınırda kırpılır
+MAKS_PAKET = 1000  # formlardan tek seferde eklenebilecek ders
+ONDALIKLAR = ["Tutar"]
+ZAMAN_SUTUNLARI = {"Ders_Gecmisi": ("Tarih", "Saat", "%d-%m-%Y"), "Finans_Kasa": ("Tarih", None, "%Y-%m-%d")}
+
+# --- ÖLÇÜM ---
+# Sheets istekleri, önbellek isabetleri, tablo kurma, yazmalar ve sayfa çizimi süreleri
+# süreç genelinde toplanır; yönetici "⏱️ Diagnostics" menüsünden görür.
+@st.cache_resource
+def olcum():
+    return Olcum()
+
+olcum().tur_baslat()
+
+# --- DEPO SEÇİMİ ---
+# COURTMASTER_SQLITE bir dosya yolu gösteriyorsa veriler Google Sheets yerine
+# o SQLite dosyasında tutulur (büyük kurulumlar ve çevrimdışı deneme için).
+# COURTMASTER_ANLIK bir dizin gösteriyorsa Sheets sayfaları oradaki paylaşılan Arrow
+# görüntülerinden okunur (birden çok kopya çalışırken; dizini yenileyici.py günceller).
+@st.cache_resource
+def depo_kur():
+    sqlite_yolu = os.environ.get("COURTMASTER_SQLITE")
+    if sqlite_yolu: return SqliteDepo(sqlite_yolu, SEMALAR)
+    anlik_dizini = os.environ.get("COURTMASTER_ANLIK")
+    if anlik_dizini: return AnlikDepo(lambda: SheetsDepo(baglanti_kur(), olcum=olcum()), anlik_dizini, SADECE_EKLENEN)
+    return SheetsDepo(baglanti_kur(), olcum=olcum())
 
 # --- VERİ ÇEKME (SAFE MODE) ---
-@st.cache_data(ttl=10)
-def get_data_cached(worksheet_name, expected_columns):
-    try:
-        sheet = baglanti_kur()
+# Her sayfa kendi önbelleğinde tutulur; bir yazma sadece o sayfayı geçersiz kılar.
+# Sadece sona satır eklenen sayfalar yenilenirken yalnızca bilinen satır sayısından
+# sonraki kuyruk çekilir (SADECE_EKLENEN ve örtüşme denetimi depo.py'de); silme/düzenleme ihtimaline karşı arada bir
+# tamamı yeniden okunur.
+
+def _ana_sayfa(ad):
+    # "Arsiv_Ders_Gecmisi_2026-09" -> "Ders_Gecmisi"
+    return ad[len("Arsiv_"):-len("_YYYY-MM")] if ad.startswith("Arsiv_") else ad
+
+@olcum().sarmala("tablo_kur")
+def _tabloya_cevir(ad, data, expected_columns):
+    # Satır satır dolaşmadan: düzensiz satırlar DataFrame'de boşlukla dolar, fazla sütunlar atılır
+    # data satır listesi ya da sütunları 0..n-1 olan DataFrame olabilir (Depo.toplu_tablo)
+    df = pd.DataFrame(data).reindex(columns=range(len(expected_columns))).reset_index(drop=True)
+    df.columns = expected_columns
+
+    for c in expected_columns:
+        if c in ONDALIKLAR:
+            df[c] = pd.to_numeric(df[c].astype(str).str.strip().str.replace(',', '.', regex=False), errors='coerce').fillna(0).astype("float64")
+        elif c in TAMSAYILAR:
+            df[c] = pd.to_numeric(df[c], errors='coerce').fillna(0).clip(*INT32_SINIRI).astype(TAMSAYILAR[c])
+        else:
+            df[c] = df[c].fillna("").astype(str)
+            if c in KATEGORILER:
+                kategoriler = pd.Index(list(dict.fromkeys(KATEGORILER[c] + sorted(df[c].unique()))), dtype=df[c].dtype)
+                df[c] = pd.Categorical(df[c], categories=kategoriler)
+
+    if _ana_sayfa(ad) in ZAMAN_SUTUNLARI:
+        tarih_c, saat_c, bicim = ZAMAN_SUTUNLARI[_ana_sayfa(ad)]
+        tarih = df[tarih_c].astype(str)
+        zaman = pd.to_datetime(tarih, format=bicim, errors='coerce')
+        if saat_c:
+            # Saat yoksa ya da "-" ise gün başı kabul edilir
+            zaman = pd.to_datetime(tarih + " " + df[saat_c].astype(str), format=f"{bicim} %H:%M", errors='coerce').fillna(zaman)
+        df["Zaman"] = zaman
+    return df
+
+def _ekle(eski, yeni):
+    # Kuyruğu önbellekteki tabloya ekler; kategoriler birleştirilerek korunur
+    df = pd.concat([eski, yeni], ignore_index=True)
+    for c in eski.columns:
+        if isinstance(eski[c].dtype, pd.CategoricalDtype) and not isinstance(df[c].dtype, pd.CategoricalDtype):
+            df[c] = union_categoricals([eski[c], yeni[c]], ignore_order=True)
+    return df
+
+def _finans_ayi(df):
+    # Ay sütunu boşsa tarihten
+    ay = df["Ay"].astype(str)
+    return ay.where(ay != "", df["Zaman"].dt.strftime("%Y-%m"))
+
+# --- FİNANS ÖZETİ ---
+# Finans_Kasa'nın (Ay, Ogrenci, Tip) bazında toplamları. Tam okumada bir kez kurulur, sonra
+# sadece eklenen kuyruk satırlarıyla güncellenir; Kasa sayfası ay sayısıyla orantılı iş yapar.
+class FinansOzeti:
+    def __init__(self, tablo):
+        self.tablo = tablo  # index: (Ay, Ogrenci, Tip), sütunlar: Tutar, Adet
+
+    @staticmethod
+    def _grupla(df):
+        gruplar = pd.DataFrame({"Ay": _finans_ayi(df).fillna(""), "Ogrenci": df["Ogrenci"].astype(str), "Tip": df["Tip"].astype(str), "Tutar": df["Tutar"]})
+        return gruplar.groupby(["Ay", "Ogrenci", "Tip"])["Tutar"].agg(Tutar="sum", Adet="count").astype("float64")
+
+    @classmethod
+    def kur(cls, df):
+        return cls(cls._grupla(df))
+
+    def eklenmis(self, df):
+        # Önbellekteki nesne değişmez; okuyan oturumlar yarım güncelleme görmesin
+        return FinansOzeti(self.tablo.add(self._grupla(df), fill_value=0))
+
+    def toplam(self, tip):
+        return self.tablo.xs(tip, level="Tip")["Tutar"].sum() if tip in self.tablo.index.get_level_values("Tip") else 0.0
+
+    def ogrenci_toplamlari(self, tip):
+        if tip not in self.tablo.index.get_level_values("Tip"): return pd.DataFrame(columns=["Ogrenci", "Tutar"])
+        return self.tablo.xs(tip, level="Tip").groupby(level="Ogrenci")["Tutar"].sum().reset_index()
+
+    def aylik(self):
+        aylik = self.tablo["Tutar"].groupby(level=["Ay", "Tip"]).sum().unstack("Tip", fill_value=0)
+        aylik = aylik.reindex(columns=["Gelir", "Gider"], fill_value=0).sort_index()
+        aylik["Net"] = aylik["Gelir"] - aylik["Gider"]
+        return aylik.reset_index()
+
+OZETLER = {"Finans_Kasa": FinansOzeti}
+
+class SayfaOnbellegi:
+    def __init__(self, ttl=10, tam_yenileme=300):
+        self.ttl, self.tam_yenileme = ttl, tam_yenileme
+        self.kilit = threading.Lock()
+        self.kilitler = {}  # sayfa -> kilit (bir sayfanın okuması diğerini bekletmesin)
+        self.kayitlar = {}  # sayfa -> {"df", "satir", "son", "zaman", "tam_zaman", "ozet", "kaynak"}
+        self.surumler = {}  # sayfa -> veri her değiştiğinde artan sayı
+
+    def _sayfa_kilidi(self, ad):
+        with self.kilit: return self.kilitler.setdefault(ad, threading.Lock())
+
+    def surum(self, ad):
+        return self.surumler.get(ad, 0)
+
+    def ozet(self, ad):
+        k = self.kayitlar.get(ad)
+        return k["ozet"] if k else None
+
+    def getir(self, ad, sutunlar):
+        return self.getir_coklu({ad: sutunlar})[ad]
+
+    def getir_coklu(self, istenen):
+        # istenen: {sayfa: sütunlar}. Bayat olanların hepsi tek toplu istekle yenilenir.
+        adlar = sorted(istenen)
+        kilitler = [self._sayfa_kilidi(ad) for ad in adlar]
+        for kilit in kilitler: kilit.acquire()
         try:
-            ws = sheet.worksheet(worksheet_name)
-        except:
-            return pd.DataFrame(columns=expected_columns)
-            
-        all_values = ws.get_all_values()
-        if len(all_values) < 2: return pd.DataFrame(columns=expected_columns)
-        
-        data = all_values[1:]
-        clean_data = []
-        for row in data:
-            if len(row) >= len(expected_columns): clean_data.append(row[:len(expected_columns)])
-            else: clean_data.append(row + [None]*(len(expected_columns)-len(row)))
-                
-        df = pd.DataFrame(clean_data, columns=expected_columns)
-        
-        if "Tutar" in df.columns:
-            df["Tutar"] = df["Tutar"].astype(str).str.strip().str.replace(',', '.', regex=False)
-            df["Tutar"] = pd.to_numeric(df["Tutar"], errors='coerce').fillna(0)
-        if "Kalan Ders" in df.columns:
-            df["Kalan Ders"] = pd.to_numeric(df["Kalan Ders"], errors='coerce').fillna(0)
-        return df
-    except: return pd.DataFrame(columns=expected_columns)
+            simdi = time.time()
+            bayat = [ad for ad in adlar if ad not in self.kayitlar or simdi - self.kayitlar[ad]["zaman"] >= self.ttl]
+            kaynak = depo_kur().surumler(bayat) if bayat else {}  # paylaşılan görüntüde dosya sürümleri
+            istekler = {}
+            for ad in adlar:
+                k = self.kayitlar.get(ad)
+                if k and ad not in bayat:
+                    olcum().say("onbellek.isabet"); continue
+                if k and kaynak[ad] is not None and kaynak[ad] == k["kaynak"]:
+                    # Kaynak değişmemiş: okumadan tazele
+                    k["zaman"] = simdi; olcum().say("onbellek.isabet"); continue
+                kuyruk = k and ad in SADECE_EKLENEN and simdi - k["tam_zaman"] < self.tam_yenileme
+                olcum().say("onbellek.kuyruk" if kuyruk else "onbellek.iska")
+                istekler[ad] = kuyruk_baslangici(k["satir"]) if kuyruk else None
+            while istekler:
+                try:
+                    with olcum().zamanla("depo.toplu_tablo"): cevap = depo_kur().toplu_tablo(istekler)
+                except Exception:
+                    # Kota/ağ hatası: elde kayıt varsa bayat veriyle devam, birkaç saniye sonra tekrar dene.
+                    # Hiç kayıt yoksa hata yukarı çıkar; boş tablo gösterilip üzerine yazılmasın.
+                    if not all(ad in self.kayitlar for ad in istekler): raise
+                    for ad in istekler: self.kayitlar[ad]["zaman"] = simdi - self.ttl + 3
+                    cevap = {}
+                tekrar = {}
+                for ad, tablo in cevap.items():
+                    if tablo is None: tablo = pd.DataFrame()
+                    olcum().boyut(f"okunan_hucre.{ad}", tablo.size)
+                    if istekler[ad] is None:
+                        df = _tabloya_cevir(ad, tablo.iloc[1:], istenen[ad])
+                        ozet = OZETLER[ad].kur(df) if ad in OZETLER else None
+                        son = ham_satir(tablo.iloc[-1]) if len(tablo) > 1 else None
+                        self.kayitlar[ad] = {"df": df, "satir": max(len(tablo) - 1, 0), "son": son, "zaman": simdi, "tam_zaman": simdi, "ozet": ozet, "kaynak": kaynak[ad]}
+                        self.surumler[ad] = self.surum(ad) + 1
+                    else:
+                        k = self.kayitlar[ad]
+                        tablo = yeni_satirlar(tablo, k["satir"], k["son"])
+                        if tablo is None:
+                            # Örtüşen satır tutmadı: satır silinmiş, sayfa baştan okunur
+                            olcum().say("onbellek.kayma"); tekrar[ad] = None; continue
+                        if len(tablo):
+                            yeni = _tabloya_cevir(ad, tablo, istenen[ad])
+                            k["df"] = _ekle(k["df"], yeni)
+                            if k["ozet"] is not None: k["ozet"] = k["ozet"].eklenmis(yeni)
+                            k["satir"] += len(tablo)
+                            k["son"] = ham_satir(tablo.iloc[-1])
+                            self.surumler[ad] = self.surum(ad) + 1
+                        k["zaman"], k["kaynak"] = simdi, kaynak[ad]
+                istekler = tekrar
+            return {ad: self.kayitlar[ad]["df"] for ad in adlar}
+        finally:
+            for kilit in kilitler: kilit.release()
+
+    def gecersiz_kil(self, ad, sadece_ekleme=False):
+        # Sona ekleme yapılan sayfada kayıt korunur, bir sonraki okuma kuyruğu çeker
+        with self._sayfa_kilidi(ad):
+            k = self.kayitlar.get(ad)
+            if k and sadece_ekleme and ad in SADECE_EKLENEN: k["zaman"] = 0
+            else: self.kayitlar.pop(ad, None)
+
+    def temizle(self):
+        for ad in list(self.kayitlar): self.gecersiz_kil(ad)
+
+@st.cache_resource
+def onbellek():
+    return SayfaOnbellegi()
+
+@olcum().sarmala("get_data_cached")
+def get_data_cached(worksheet_name, expected_columns):
+    # Çağıran tarafın değişiklikleri önbelleğe sızmasın diye kopya döner.
+    # Hata yutulmaz: save_data boş tabloyla fark alıp gerçek satırların üzerine yazmasın.
+    return onbellek().getir(worksheet_name, expected_columns).copy()
+
+@olcum().sarmala("get_data_many")
+def get_data_many(istenen):
+    # {sayfa: sütunlar} -> {sayfa: df}; bayat sayfalar tek istekte okunur
+    try: return {ad: df.copy() for ad, df in onbellek().getir_coklu(istenen).items()}
+    except Exception as e:
+        st.error(f"Veriler okunamadı, lütfen biraz sonra yenileyin. ({e})")
+        st.stop()
+
+def _hucre_degeri(x):
+    # Sheets'e yazılabilir tek hücre değeri (numpy sayıları -> python, boş -> "")
+    if x is None or (not isinstance(x, str) and pd.isna(x)): return ""
+    if hasattr(x, "item"): x = x.item()
+    if isinstance(x, (int, float)): return x
+    return str(x)
+
+def _hucre_tablosu(df, columns):
+    return df[columns].astype(object).where(df[columns].notna(), "").astype(str)
+
+# --- YAZMA TAMPONU ---
+# Bir çalıştırmada yapılan tüm yazmalar burada toplanır ve sonunda sayfa başına
+# tek istekle gönderilir (hücre güncelleme, silme, satır ekleme). Satır numaraları
+# depo düzenindedir: 0 = ilk veri satırı = df index 0.
+# Konumlar önbellekten gelir (bayat olabilir): göndermeden önce sadece hedef satırların anahtar
+# hücreleri kaynaktan okunup karşılaştırılır; biri tutmazsa hiçbir şey yazılmaz.
+ANAHTAR_SUTUNLARI = {"Ogrenci_Data": "Ad Soyad", "Ders_Programi": "Saat"}
+
+class SatirKaydi(Exception):
+    pass
 
+class YazmaTamponu:
+    def __init__(self):
+        self.hucreler = {}      # sayfa -> {(satir, sutun): deger}
+        self.silinecek = {}     # sayfa -> {satir}
+        self.beklenen = {}      # sayfa -> {satir: anahtar değeri}  (hücre/silme hedefleri)
+        self.yeni_satirlar = {} # sayfa -> {df index: satir}  (save_data)
+        self.ek_satirlar = {}   # sayfa -> [satir]            (append_data)
+
+    def bos_mu(self):
+        return not (self.hucreler or self.silinecek or self.yeni_satirlar or self.ek_satirlar)
+
+    @olcum().sarmala("tampon.gonder")
+    def gonder(self):
+        if self.bos_mu(): return
+        depo = depo_kur()
+        for ad, beklenen in self.beklenen.items():
+            sutun = SEMALAR[ad].index(ANAHTAR_SUTUNLARI[ad])
+            gercek = depo.hucreleri_oku(ad, [(i, sutun) for i in beklenen])
+            if any(gercek[(i, sutun)] != v for i, v in beklenen.items()):
+                self.__init__()
+                onbellek().gecersiz_kil(ad)
+                raise SatirKaydi("Tablo bu ekran açıldıktan sonra değişmiş; işlem uygulanmadı ve veriler yenilendi. Lütfen tekrar deneyin.")
+        sayfalar = set(self.hucreler) | set(self.silinecek) | set(self.yeni_satirlar) | set(self.ek_satirlar)
+        for ad in sayfalar:
+            ek = list(self.yeni_satirlar.get(ad, {}).values()) + self.ek_satirlar.get(ad, [])
+            olcum().boyut(f"yazilan_hucre.{ad}", len(self.hucreler.get(ad, {})) + sum(map(len, ek)))
+            if self.hucreler.get(ad): depo.hucre_guncelle(ad, self.hucreler[ad])
+            if self.silinecek.get(ad): depo.satir_sil(ad, self.silinecek[ad])
+            satirlar = list(self.yeni_satirlar.get(ad, {}).values()) + self.ek_satirlar.get(ad, [])
+            if satirlar: depo.satir_ekle(ad, satirlar)
+            onbellek().gecersiz_kil(ad, sadece_ekleme=not (self.hucreler.get(ad) or self.silinecek.get(ad)))
+        self.__init__()
+
+tampon = YazmaTamponu()
+
+def yeniden_yukle():
+    try: tampon.gonder()
+    except SatirKaydi as e: st.session_state["yazma_hatasi"] = str(e)  # rerun sonrası gösterilir
+    olcum().tur_bitir(menu); st.rerun()
+
+@olcum().sarmala("save_data")
 def save_data(df, worksheet_name, columns):
-    sheet = baglanti_kur(); ws = sheet.worksheet(worksheet_name)
-    ws.clear(); ws.update([df.columns.values.tolist()] + df.values.tolist())
-    st.cache_data.clear()
+    # Sadece değişen hücreleri tampona yazar. df'in index'i sayfadaki satır sırasıdır
+    # (index i -> i. veri satırı); get_data_cached bu düzende döndürür.
+    onceki = get_data_cached(worksheet_name, columns)
+
+    ortak = df.index.intersection(onceki.index)
+    if len(ortak):
+        farkli = (_hucre_tablosu(df.loc[ortak], columns) != _hucre_tablosu(onceki.loc[ortak], columns)).to_numpy()
+        hucreler = tampon.hucreler.setdefault(worksheet_name, {})
+        for r, c in zip(*farkli.nonzero()):
+            i = ortak[r]
+            hucreler[(int(i), int(c))] = _hucre_degeri(df.at[i, columns[c]])
 
+    silinen = onceki.index.difference(df.index)
+    if len(silinen): tampon.silinecek.setdefault(worksheet_name, set()).update(int(i) for i in silinen)
+
+    anahtar = ANAHTAR_SUTUNLARI.get(worksheet_name)
+    if anahtar:
+        hedefler = [i for i in {r for r, _ in tampon.hucreler.get(worksheet_name, {})} | tampon.silinecek.get(worksheet_name, set()) if i in onceki.index]
+        if hedefler:
+            beklenen = tampon.beklenen.setdefault(worksheet_name, {})
+            for i in hedefler: beklenen.setdefault(i, _hucre_tablosu(onceki.loc[[i]], [anahtar]).iat[0, 0])
+
+    yeni = df.loc[df.index.difference(onceki.index), columns]
+    if not yeni.empty:
+        yeni_satirlar = tampon.yeni_satirlar.setdefault(worksheet_name, {})
+        for i, row in zip(yeni.index, yeni.itertuples(index=False)): yeni_satirlar[i] = [_hucre_degeri(x) for x in row]
+
+@olcum().sarmala("append_data")
 def append_data(row_data, worksheet_name, columns):
-    sheet = baglanti_kur(); ws = sheet.worksheet(worksheet_name)
-    clean_row = []
-    for x in row_data:
-        if isinstance(x, (int, float)): clean_row.append(x)
-        else: clean_row.append(str(x))
-    ws.append_row(clean_row)
-    st.cache_data.clear()
+    tampon.ek_satirlar.setdefault(worksheet_name, []).append([_hucre_degeri(x) for x in row_data])
 
 # --- 🕵️‍♂️ ZİYARETÇİ ---
+# Ziyaretler bellekte günlük sayaç olarak toplanır; arka plandaki iş parçacığı
+# bunları belirli aralıklarla Ziyaretci_Istatistik sayfasına yazar. Sayfa açılışı yazma beklemez.
+# Her boşaltma [gün, adet] satırı ekler (oku-topla-yaz yok): birden çok kopya birbirinin
+# sayısını ezmez; okurken gün başına toplanır.
+class ZiyaretSayaci:
+    def __init__(self, aralik=60):
+        self.aralik = aralik
+        self.kilit = threading.Lock()
+        self.bekleyen = {}  # tarih -> adet
+        threading.Thread(target=self._dongu, daemon=True).start()
+        atexit.register(self._guvenli_bosalt)
+
+    def kaydet(self):
+        gun = datetime.now().strftime("%Y-%m-%d")
+        with self.kilit: self.bekleyen[gun] = self.bekleyen.get(gun, 0) + 1
+
+    def _dongu(self):
+        while True:
+            time.sleep(self.aralik)
+            self._guvenli_bosalt()
+
+    def _guvenli_bosalt(self):
+        try: self.bosalt()
+        except Exception: pass  # sayılar geri eklendi, bir sonraki turda tekrar denenir
+
+    def bosalt(self):
+        with self.kilit: bekleyen, self.bekleyen = self.bekleyen, {}
+        if not bekleyen: return
+        try:
+            depo_kur().ekle_ya_da_kur("Ziyaretci_Istatistik", COL_ZIYARET, [[gun, adet] for gun, adet in sorted(bekleyen.items())])
+            onbellek().gecersiz_kil("Ziyaretci_Istatistik", sadece_ekleme=True)
+        except Exception:
+            with self.kilit:
+                for gun, adet in bekleyen.items(): self.bekleyen[gun] = self.bekleyen.get(gun, 0) + adet
+            raise
+
+@st.cache_resource
+def ziyaret_sayaci():
+    return ZiyaretSayaci()
+
 if "ziyaret_kaydedildi" not in st.session_state:
-    try:
-        tarih = datetime.now().strftime("%d-%m-%Y")
-        saat = datetime.now().strftime("%H:%M")
-        append_data([tarih, saat, "Misafir", "Giriş", "Sayfa Görüntülendi"], "Ders_Gecmisi", COL_LOG)
-        st.session_state["ziyaret_kaydedildi"] = True
-    except: pass
+    ziyaret_sayaci().kaydet()
+    st.session_state["ziyaret_kaydedildi"] = True
+
+# --- OYUNCU İNDEKSİ ---
+# Veri sürümü başına bir kez kurulur: oyuncu -> öğrenci satırı, aktif oyuncular ve
+# en yeni ZAMAN_CIZELGESI_N kayıtlık hazır kişisel geçmiş. Oyuncu değiştirmek tarama yapmaz.
+ZAMAN_CIZELGESI_N = 10
+
+class OyuncuIndeksi:
+    def __init__(self, df_main, df_logs, df_finans):
+        adlar = df_main["Ad Soyad"].astype(str)
+        self.satir = dict(zip(adlar[~adlar.duplicated()], df_main.index[~adlar.duplicated()]))
+        self.aktifler = list(dict.fromkeys(adlar[(df_main["Durum"] == "Aktif").to_numpy()]))
+
+        logs = df_logs.assign(Tip="Ders")
+        fins = df_finans[df_finans["Tip"] == "Gelir"]
+        fins_fmt = pd.DataFrame({"Tarih": fins["Tarih"].astype(str), "Saat": "-", "Ogrenci": fins["Ogrenci"], "Islem": "Ödeme", "Detay": [f"{x:,.0f} TL" for x in fins["Tutar"]], "Tip": "Para", "Zaman": fins["Zaman"]})
+        full_log = pd.concat([logs, fins_fmt], ignore_index=True)
+        full_log["Ogrenci"] = full_log["Ogrenci"].astype(str)
+        full_log = full_log.iloc[::-1].sort_values("Zaman", ascending=False, kind="stable")
+        son = full_log.groupby("Ogrenci", sort=False).head(ZAMAN_CIZELGESI_N)
+        self.gecmisler = {ad: g for ad, g in son.groupby("Ogrenci", sort=False)}
+
+    def gecmis(self, ad):
+        return self.gecmisler.get(ad, pd.DataFrame(columns=COL_LOG + ["Tip", "Zaman"]))
+
+@st.cache_resource(max_entries=4)
+def _oyuncu_indeksi(anahtar, _df_main, _df_logs, _df_finans):
+    return OyuncuIndeksi(_df_main, _df_logs, _df_finans)
+
+def oyuncu_indeksi(df_main, df_logs, df_finans):
+    # Anahtar: sayfaların önbellek sürümleri (ve boyları, okuma hatasında boş tabloyla karışmasın)
+    anahtar = tuple((onbellek().surum(ad), len(df)) for ad, df in [("Ogrenci_Data", df_main), ("Ders_Gecmisi", df_logs), ("Finans_Kasa", df_finans)])
+    return _oyuncu_indeksi(anahtar, df_main, df_logs, df_finans)
+
+# --- GEÇMİŞ ZAMAN ÇİZELGESİ ---
+# Birleşik kayıt listesi, filtreler ve SAYFA_BOYU'luk HTML sayfaları veri sürümü başına
+# bir kez hesaplanır; ekrana tek markdown bloğu olarak basılır.
+SAYFA_BOYU = 50
+GECMIS_FILTRELERI = {"Tümü": "tumu", "🎾 Ders Hareketleri": "ders", "💰 Finans Raporu": "finans"}
+ZAMAN_STILLERI = {"Para": ("t-money", "💰"), "Gider": ("t-sys", "📉"), "Ziyaret": ("t-sys", "👀")}
+
+class GecmisGorunumu:
+    def __init__(self, df_logs, df_finans):
+        logs = df_logs.assign(Tip="Ders")
+        fins = df_finans
+        fins_fmt = pd.DataFrame({"Tarih": fins["Tarih"].astype(str), "Saat": "-", "Ogrenci": fins["Ogrenci"], "Islem": [f"Finans: {x}" for x in fins["Tip"]], "Detay": [f"{x:,.0f} TL - {y}" for x, y in zip(fins["Tutar"], fins["Not"])], "Tip": ["Para" if t=="Gelir" else "Gider" for t in fins["Tip"]], "Zaman": fins["Zaman"]})
+        master_log = pd.concat([logs, fins_fmt], ignore_index=True)
+        master_log.loc[master_log["Ogrenci"] == "Misafir", "Tip"] = "Ziyaret"  # eski sürümden kalan ziyaret satırları
+        self.master_log = master_log.iloc[::-1].sort_values("Zaman", ascending=False, kind="stable")
+        self._filtreli = {}
+        self._sayfalar = {}
+
+    def filtreli(self, filtre):
+        if filtre not in self._filtreli:
+            m = self.master_log
+            if filtre == "ders": m = m[(m["Tip"] == "Ders") & (m["Ogrenci"] != "Misafir")]
+            elif filtre == "finans": m = m[m["Tip"].isin(["Para", "Gider"])]
+            elif isinstance(filtre, tuple): m = m[m["Ogrenci"] == filtre[1]]  # ("oyuncu", ad)
+            self._filtreli[filtre] = m
+        return self._filtreli[filtre]
+
+    def sayfa_html(self, filtre, no):
+        if (filtre, no) not in self._sayfalar:
+            df = self.filtreli(filtre).iloc[no * SAYFA_BOYU:(no + 1) * SAYFA_BOYU]
+            e = lambda x: html.escape(str(x))  # tek blok: bozuk bir not bütün sayfayı bozmasın
+            ogeler = []
+            for tarih, saat, ogrenci, islem, detay, tip in zip(df["Tarih"], df["Saat"], df["Ogrenci"], df["Islem"], df["Detay"], df["Tip"]):
+                css, icon = ZAMAN_STILLERI.get(tip, ("t-lesson", "🎾"))
+                ogeler.append(f"""<div class="timeline-item {css}"><span class="time-badge">{e(tarih)} {e(saat)}</span><div class="log-title">{icon} {e(ogrenci)} - {e(islem)}</div><div class="log-detail">{e(detay)}</div></div>""")
+            self._sayfalar[(filtre, no)] = "".join(ogeler)
+        return self._sayfalar[(filtre, no)]
+
+@st.cache_resource(max_entries=4)
+def _gecmis_gorunumu(anahtar, _df_logs, _df_finans):
+    return GecmisGorunumu(_df_logs, _df_finans)
+
+def gecmis_gorunumu(df_logs, df_finans, log_sayfasi="Ders_Gecmisi", finans_sayfasi="Finans_Kasa"):
+    anahtar = tuple((ad, onbellek().surum(ad), len(df)) for ad, df in [(log_sayfasi, df_logs), (finans_sayfasi, df_finans)])
+    return _gecmis_gorunumu(anahtar, df_logs, df_finans)
+
+def arsiv_gorunumu(donem):
+    # Arşivlenmiş bir ay sadece istendiğinde okunur
+    log_sayfasi, finans_sayfasi = f"Arsiv_Ders_Gecmisi_{donem}", f"Arsiv_Finans_Kasa_{donem}"
+    arsiv = get_data_many({log_sayfasi: COL_LOG, finans_sayfasi: COL_FINANS})
+    return gecmis_gorunumu(arsiv[log_sayfasi], arsiv[finans_sayfasi], log_sayfasi, finans_sayfasi)
+
+def _sonraki_sayfa(anahtar):
+    st.session_state[anahtar] = st.session_state.get(anahtar, 1) + 1
+
+# --- ARŞİVLEME ---
+# Kapanmış ayların (bu aydan önceki) Ders_Gecmisi / Finans_Kasa satırları aylık arşiv
+# sayfalarına (Arsiv_<sayfa>_<YYYY-AA>) taşınır; sıcak sayfada öğrenci başına aylık tek
+# özet satırı kalır. Finans özetleri tutarları korur, Kasa toplamları değişmez.
+ARSIV_OZETI = "Arşiv Özeti"
+
+@st.cache_data(ttl=60)
+def arsiv_donemleri():
+    try: adlar = depo_kur().sayfa_listesi()
+    except: return []
+    return sorted({ad[-7:] for ad in adlar if ad.startswith(("Arsiv_Ders_Gecmisi_", "Arsiv_Finans_Kasa_"))}, reverse=True)
+
+def _ders_ozetleri(df, ay):
+    g = df.assign(_ay=ay, _ders=(df["Islem"] == "Ders İşlendi").astype(int) - (df["Islem"] == "Geri Alındı").astype(int))
+    g = g.groupby(["_ay", g["Ogrenci"].astype(str)]).agg(kayit=("Islem", "size"), ders=("_ders", "sum")).reset_index()
+    return [[f"01-{donem[5:]}-{donem[:4]}", "-", ogrenci, ARSIV_OZETI, f"{donem}: {ders} ders, {kayit} kayıt"]
+            for donem, ogrenci, kayit, ders in g[["_ay", "Ogrenci", "kayit", "ders"]].itertuples(index=False)]
+
+def _finans_ozetleri(df, ay):
+    g = df.assign(_ay=ay).groupby(["_ay", df["Ogrenci"].astype(str), df["Tip"].astype(str)])["Tutar"].agg(["sum", "size"]).reset_index()
+    return [[f"{donem}-01", donem, ogrenci, float(tutar), f"{ARSIV_OZETI} ({adet} kayıt)", tip]
+            for donem, ogrenci, tip, tutar, adet in g.itertuples(index=False)]
+
+def _sayfayi_arsivle(depo, ad, sutunlar, bu_ay):
+    tum = depo.oku(ad)
+    if not tum or len(tum) < 2: return 0
+    ham = tum[1:]
+    df = _tabloya_cevir(ad, ham, sutunlar)
+    if ad == "Finans_Kasa":
+        ay, ozet_mu, ozetle = _finans_ayi(df), df["Not"].str.startswith(ARSIV_OZETI), _finans_ozetleri
+    else:
+        ay, ozet_mu, ozetle = df["Zaman"].dt.strftime("%Y-%m"), df["Islem"] == ARSIV_OZETI, _ders_ozetleri
+    secili = (ay.notna() & (ay.fillna("") != "") & (ay.fillna("") < bu_ay) & ~ozet_mu).to_numpy()
+    if not secili.any(): return 0
+
+    # Önce arşive yaz: yarıda kesilirse veri kaybolmaz, sadece sıcak sayfada kopya kalır
+    for donem, g in df[secili].groupby(ay[secili]):
+        depo.ekle_ya_da_kur(f"Arsiv_{ad}_{donem}", sutunlar, [ham[i] for i in g.index])
+    depo.satir_sil(ad, df.index[secili].tolist())
+    depo.satir_ekle(ad, [[_hucre_degeri(x) for x in r] for r in ozetle(df[secili], ay[secili])])
+    onbellek().gecersiz_kil(ad)
+    return int(secili.sum())
+
+def arsivle():
+    depo = depo_kur()
+    bu_ay = datetime.now().strftime("%Y-%m")
+    tasinan = {ad: _sayfayi_arsivle(depo, ad, sutunlar, bu_ay) for ad, sutunlar in [("Ders_Gecmisi", COL_LOG), ("Finans_Kasa", COL_FINANS)]}
+    arsiv_donemleri.clear()
+    return tasinan
 
 # --- ARAYÜZ ---
 with st.sidebar:
@@ -125,66 +563,56 @@ with st.sidebar:
     IS_ADMIN = st.session_state.get("admin", False)
     
     if IS_ADMIN:
-        menu = st.radio("MENÜ", ["🏠 Kort Paneli", "📅 Çizelge", "👥 Sporcular", "💸 Kasa", "📝 Geçmiş"])
+        menu = st.radio("MENÜ", ["🏠 Kort Paneli", "📅 Çizelge", "👥 Sporcular", "💸 Kasa", "📝 Geçmiş", "⏱️ Diagnostics"])
         
         # --- 🛠️ TAMİR BUTONU (SADECE ADMIN) ---
         st.markdown("---")
         if st.button("🔴 VERİTABANINI SIFIRLA VE KUR"):
             with st.spinner("Veritabanı onarılıyor... Lütfen bekleyin..."):
                 try:
-                    sheet = baglanti_kur()
-                    # 1. Ogrenci_Data
-                    try: sheet.del_worksheet(sheet.worksheet("Ogrenci_Data"))
-                    except: pass
-                    time.sleep(1.5) # API Kotası için bekleme
-                    ws1 = sheet.add_worksheet("Ogrenci_Data", 1000, 20)
-                    ws1.append_row(COL_OGRENCI)
-                    
-                    # 2. Finans_Kasa
-                    try: sheet.del_worksheet(sheet.worksheet("Finans_Kasa"))
-                    except: pass
-                    time.sleep(1.5)
-                    ws2 = sheet.add_worksheet("Finans_Kasa", 1000, 20)
-                    ws2.append_row(COL_FINANS)
-                    
-                    # 3. Ders_Gecmisi
-                    try: sheet.del_worksheet(sheet.worksheet("Ders_Gecmisi"))
-                    except: pass
-                    time.sleep(1.5)
-                    ws3 = sheet.add_worksheet("Ders_Gecmisi", 1000, 20)
-                    ws3.append_row(COL_LOG)
-                    
-                    # 4. Ders_Programi
-                    try: sheet.del_worksheet(sheet.worksheet("Ders_Programi"))
-                    except: pass
-                    time.sleep(1.5)
-                    ws4 = sheet.add_worksheet("Ders_Programi", 1000, 20)
-                    ws4.append_row(COL_PROG)
+                    # Dört sayfa tek batch_update ile silinip başlık ve satırlarıyla yeniden kurulur
                     saatler = [[f"{h:02d}:00"] + [""]*7 for h in range(8, 24)]
-                    ws4.append_rows(saatler)
+                    depo_kur().semalari_kur({
+                        "Ogrenci_Data": (COL_OGRENCI, []),
+                        "Finans_Kasa": (COL_FINANS, []),
+                        "Ders_Gecmisi": (COL_LOG, []),
+                        "Ders_Programi": (COL_PROG, saatler),
+                    })
                     
                     st.success("✅ Kurulum Başarıyla Tamamlandı! Sayfayı yenileyin.")
-                    st.cache_data.clear()
+                    onbellek().temizle()
+                except Exception as e:
+                    st.error(f"Hata oluştu: {e}")
+
+        if st.button("📦 ESKİ AYLARI ARŞİVLE"):
+            with st.spinner("Kapanmış aylar arşive taşınıyor..."):
+                try:
+                    tasinan = arsivle()
+                    st.success(f"✅ Arşivlendi: {tasinan['Ders_Gecmisi']} ders kaydı, {tasinan['Finans_Kasa']} finans kaydı.")
                 except Exception as e:
                     st.error(f"Hata oluştu: {e}")
 
     else:
         menu = st.radio("MENÜ", ["🏠 Kort Paneli", "📅 Çizelge", "👥 Sporcular"])
 
-# Verileri Çek
-df_main = get_data_cached("Ogrenci_Data", COL_OGRENCI)
-df_finans = get_data_cached("Finans_Kasa", COL_FINANS)
-df_logs = get_data_cached("Ders_Gecmisi", COL_LOG)
+# Verileri Çek (sayfanın ihtiyaç duyduğu her şey tek istekte)
+gerekli = {"Ogrenci_Data": COL_OGRENCI, "Finans_Kasa": COL_FINANS, "Ders_Gecmisi": COL_LOG}
+if menu == "📅 Çizelge": gerekli["Ders_Programi"] = COL_PROG
+elif menu == "📝 Geçmiş": gerekli["Ziyaretci_Istatistik"] = COL_ZIYARET
+veriler = get_data_many(gerekli)
+df_main, df_finans, df_logs = veriler["Ogrenci_Data"], veriler["Finans_Kasa"], veriler["Ders_Gecmisi"]
 
 # --- İÇERİK ---
+sayfa_baslangic = time.perf_counter()
+if "yazma_hatasi" in st.session_state: st.error(st.session_state.pop("yazma_hatasi"))
 if menu == "🏠 Kort Paneli":
     st.markdown("<h2 style='color: white;'>🎾 Kort Yönetimi</h2>", unsafe_allow_html=True)
-    aktif = df_main[df_main["Durum"]=="Aktif"]
-    if not aktif.empty:
+    indeks = oyuncu_indeksi(df_main, df_logs, df_finans)
+    if indeks.aktifler:
         col_select, col_empty = st.columns([2,1])
-        with col_select: sec = st.selectbox("Oyuncu Seç", aktif["Ad Soyad"].unique())
+        with col_select: sec = st.selectbox("Oyuncu Seç", indeks.aktifler)
         if sec:
-            idx = df_main[df_main["Ad Soyad"]==sec].index[0]
+            idx = indeks.satir[sec]
             kalan = int(df_main.at[idx, "Kalan Ders"])
             odeme_durumu = df_main.at[idx, "Odeme Durumu"]
             bar_color = "#ccff00" if kalan > 5 else ("#ffa500" if kalan > 2 else "#ff4b4b")
@@ -215,18 +643,18 @@ if menu == "🏠 Kort Paneli":
                             if df_main.at[idx, "Kalan Ders"] == 0: df_main.at[idx, "Durum"] = "Bitti"
                             save_data(df_main, "Ogrenci_Data", COL_OGRENCI)
                             append_data([datetime.now().strftime("%d-%m-%Y"), datetime.now().strftime("%H:%M"), sec, "Ders İşlendi", f"Kalan: {kalan-1}"], "Ders_Gecmisi", COL_LOG)
-                            st.rerun()
+                            yeniden_yukle()
                 with c2:
                     if st.button("↩️ GERİ (+1)"):
                         df_main.at[idx, "Kalan Ders"] += 1
                         save_data(df_main, "Ogrenci_Data", COL_OGRENCI)
                         append_data([datetime.now().strftime("%d-%m-%Y"), datetime.now().strftime("%H:%M"), sec, "Geri Alındı", f"Kalan: {kalan+1}"], "Ders_Gecmisi", COL_LOG)
-                        st.rerun()
+                        yeniden_yukle()
                 with c3:
                     if st.button("🗑️ SİL"):
                         df_main = df_main.drop(idx)
                         save_data(df_main, "Ogrenci_Data", COL_OGRENCI)
-                        st.warning("Silindi"); time.sleep(1); st.rerun()
+                        st.warning("Silindi"); time.sleep(1); yeniden_yukle()
     else: st.info("Kortta kimse yok.")
 
 elif menu == "👥 Sporcular":
@@ -234,9 +662,10 @@ elif menu == "👥 Sporcular":
     if IS_ADMIN:
         t1, t2 = st.tabs(["👤 Profil Kartı", "➕ Yeni Kayıt"])
         with t1:
-            secilen = st.selectbox("Oyuncu Seç", ["Seçiniz..."] + list(df_main["Ad Soyad"].unique()))
+            indeks = oyuncu_indeksi(df_main, df_logs, df_finans)
+            secilen = st.selectbox("Oyuncu Seç", ["Seçiniz..."] + list(indeks.satir))
             if secilen != "Seçiniz...":
-                idx = df_main[df_main["Ad Soyad"] == secilen].index[0]
+                idx = indeks.satir[secilen]
                 durum = df_main.at[idx, "Durum"]
                 odeme = df_main.at[idx, "Odeme Durumu"]
                 if durum == "Donduruldu": b_durum_cls, b_durum_txt = "badge-frozen", "DONDURULDU"
@@ -248,7 +677,7 @@ elif menu == "👥 Sporcular":
                     st.markdown("#### ⚙️ İşlemler")
                     with st.form("ayar_form"):
                         st.write(f"Mevcut Ders: **{df_main.at[idx, 'Kalan Ders']}**")
-                        ek = st.number_input("➕ Paket Ekle (Ders)", 0, step=1)
+                        ek = st.number_input("➕ Paket Ekle (Ders)", 0, MAKS_PAKET, step=1)
                         st.markdown("---")
                         y_odeme = st.selectbox("Durum", ["Ödenmedi", "Ödendi"], index=0 if odeme=="Ödenmedi" else 1)
                         y_tutar = st.number_input("Tahsilat Yap (TL)", 0.0, step=100.0)
@@ -269,30 +698,29 @@ elif menu == "👥 Sporcular":
                             elif dondur and durum == "Donduruldu": df_main.at[idx, "Durum"] = "Aktif"
                             elif df_main.at[idx, "Kalan Ders"] > 0: df_main.at[idx, "Durum"] = "Aktif"
                             save_data(df_main, "Ogrenci_Data", COL_OGRENCI)
-                            st.success("Kaydedildi"); time.sleep(0.5); st.rerun()
+                            st.success("Kaydedildi"); time.sleep(0.5); yeniden_yukle()
                 with col_R:
                     st.markdown("#### 📜 Kişisel Geçmiş")
-                    logs = df_logs[df_logs["Ogrenci"]==secilen].copy(); logs["Tip"] = "Ders"
-                    fins = df_finans[(df_finans["Ogrenci"]==secilen) & (df_finans["Tip"]=="Gelir")].copy()
-                    if not fins.empty:
-                        fins["Tutar"] = pd.to_numeric(fins["Tutar"], errors='coerce').fillna(0)
-                        fins_fmt = pd.DataFrame({"Tarih": [str(x) for x in fins["Tarih"]], "Saat": ["-"]*len(fins), "Ogrenci": fins["Ogrenci"], "Islem": ["Ödeme"]*len(fins), "Detay": [f"{x:,.0f} TL" for x in fins["Tutar"]], "Tip": ["Para"]*len(fins)})
-                        full_log = pd.concat([logs, fins_fmt], ignore_index=True)
-                    else: full_log = logs
+                    full_log = indeks.gecmis(secilen)
                     if not full_log.empty:
-                        full_log = full_log.iloc[::-1]
                         st.markdown('<div class="timeline-container">', unsafe_allow_html=True)
-                        for _, r in full_log.head(10).iterrows():
+                        for _, r in full_log.iterrows():
                             cls = "t-money" if r.get("Tip")=="Para" else "t-lesson"
                             icon = "💰" if r.get("Tip")=="Para" else "🎾"
                             st.markdown(f"""<div class="timeline-item {cls}"><span class="time-badge">{r['Tarih']} {r['Saat']}</span><div class="log-title">{icon} {r['Islem']}</div><div class="log-detail">{r['Detay']}</div></div>""", unsafe_allow_html=True)
                         st.markdown('</div>', unsafe_allow_html=True)
                     else: st.info("Kayıt yok.")
+                    donemler = arsiv_donemleri()
+                    if donemler and st.checkbox("📦 Arşivi Göster"):
+                        donem = st.selectbox("Dönem", donemler)
+                        arsiv_html = arsiv_gorunumu(donem).sayfa_html(("oyuncu", secilen), 0)
+                        if arsiv_html: st.markdown(f'<div class="timeline-container">{arsiv_html}</div>', unsafe_allow_html=True)
+                        else: st.info("Bu dönemde kayıt yok.")
         with t2:
             st.markdown("### 🆕 Yeni Kayıt")
             with st.form("new_user"):
                 ad = st.text_input("Ad Soyad")
-                p = st.number_input("Paket (Ders)", 0, step=1, value=10)
+                p = st.number_input("Paket (Ders)", 0, MAKS_PAKET, step=1, value=10)
                 u = st.number_input("Peşinat (TL)", 0.0, step=100.0)
                 o = st.selectbox("Durum", ["Ödenmedi", "Ödendi"])
                 if st.form_submit_button("EKLE"):
@@ -302,15 +730,17 @@ elif menu == "👥 Sporcular":
                     if u > 0:
                         append_data([datetime.now().strftime("%Y-%m-%d"), datetime.now().strftime("%Y-%m"), ad, float(u), "İlk Kayıt", "Gelir"], "Finans_Kasa", COL_FINANS)
                         append_data([datetime.now().strftime("%d-%m-%Y"), datetime.now().strftime("%H:%M"), ad, "Ödeme", f"{u} TL"], "Ders_Gecmisi", COL_LOG)
-                    st.success("Eklendi"); time.sleep(0.5); st.rerun()
+                    st.success("Eklendi"); time.sleep(0.5); yeniden_yukle()
     else: st.dataframe(df_main, use_container_width=True)
 
 elif menu == "💸 Kasa":
     st.markdown("<h2 style='color: white;'>💸 Kasa</h2>", unsafe_allow_html=True)
     if IS_ADMIN:
+        ozet = onbellek().ozet("Finans_Kasa")
+        if ozet is None: ozet = FinansOzeti.kur(df_finans)  # okuma hatası sonrası boş tablo
         if not df_finans.empty:
-            gelir = df_finans[df_finans["Tip"]=="Gelir"]["Tutar"].sum()
-            gider = df_finans[df_finans["Tip"]=="Gider"]["Tutar"].sum()
+            gelir = ozet.toplam("Gelir")
+            gider = ozet.toplam("Gider")
             c1, c2, c3 = st.columns(3)
             c1.metric("GELİR", f"{gelir:,.0f} TL")
             c2.metric("GİDER", f"{gider:,.0f} TL")
@@ -325,51 +755,88 @@ elif menu == "💸 Kasa":
                     fa = st.text_input("Açıklama", "Genel")
                     if st.form_submit_button("EKLE"):
                         append_data([datetime.now().strftime("%Y-%m-%d"), datetime.now().strftime("%Y-%m"), "Genel", float(ft), fa, ftp], "Finans_Kasa", COL_FINANS)
-                        st.rerun()
+                        yeniden_yukle()
             with col_graph:
-                gf = df_finans[df_finans["Tip"]=="Gelir"]
+                gf = ozet.ogrenci_toplamlari("Gelir")
                 if not gf.empty:
                     fig = px.pie(gf, values="Tutar", names="Ogrenci", title="Gelir Dağılımı", hole=0.4, color_discrete_sequence=px.colors.sequential.Greens_r)
                     fig.update_layout(height=300, margin=dict(t=30, b=0, l=0, r=0))
                     st.plotly_chart(fig, use_container_width=True)
-            st.dataframe(df_finans.sort_index(ascending=False), use_container_width=True)
+            aylik = ozet.aylik()
+            if not aylik.empty:
+                fig = px.bar(aylik, x="Ay", y=["Gelir", "Gider"], barmode="group", title="Aylık Trend", color_discrete_sequence=["#00e676", "#ff4b4b"])
+                fig.add_scatter(x=aylik["Ay"], y=aylik["Net"], name="Net", mode="lines+markers", line=dict(color="#ccff00"))
+                fig.update_layout(height=300, margin=dict(t=30, b=0, l=0, r=0), xaxis_type="category", legend_title_text="")
+                st.plotly_chart(fig, use_container_width=True)
+            st.dataframe(df_finans.iloc[::-1].sort_values("Zaman", ascending=False, kind="stable"), use_container_width=True)
         else: st.info("Veri yok. Kasa boş.")
 
 elif menu == "📝 Geçmiş":
     st.markdown("<h2 style='color: white;'>📝 Geçmiş Kayıtlar</h2>", unsafe_allow_html=True)
-    logs = df_logs.copy(); logs["Tip"] = "Ders"
-    fins = df_finans.copy()
-    if not fins.empty:
-        fins["Tutar"] = pd.to_numeric(fins["Tutar"], errors='coerce').fillna(0)
-        fins_fmt = pd.DataFrame({"Tarih": [str(x) for x in fins["Tarih"]], "Saat": ["-"]*len(fins), "Ogrenci": fins["Ogrenci"], "Islem": [f"Finans: {x}" for x in fins["Tip"]], "Detay": [f"{x:,.0f} TL - {y}" for x, y in zip(fins["Tutar"], fins["Not"])], "Tip": ["Para" if t=="Gelir" else "Gider" for t in fins["Tip"]]})
-        master_log = pd.concat([logs, fins_fmt], ignore_index=True)
-    else: master_log = logs
-    master_log.loc[master_log["Ogrenci"] == "Misafir", "Tip"] = "Ziyaret"
-    if not master_log.empty:
-        master_log = master_log.iloc[::-1]
-        tab_all, tab_ders, tab_finans, tab_sys = st.tabs(["Tümü", "🎾 Ders Hareketleri", "💰 Finans Raporu", "👀 Ziyaretçi Logu"])
-        def render_timeline(df_subset):
-            if df_subset.empty:
-                st.info("Bu kategoride kayıt yok.")
-                return
-            st.markdown('<div class="timeline-container">', unsafe_allow_html=True)
-            for _, r in df_subset.head(50).iterrows():
-                tip = r.get("Tip")
-                if tip == "Para": css = "t-money"; icon = "💰"
-                elif tip == "Gider": css = "t-sys"; icon = "📉"
-                elif tip == "Ziyaret": css = "t-sys"; icon = "👀"
-                else: css = "t-lesson"; icon = "🎾"
-                st.markdown(f"""<div class="timeline-item {css}"><span class="time-badge">{r['Tarih']} {r['Saat']}</span><div class="log-title">{icon} {r['Ogrenci']} - {r['Islem']}</div><div class="log-detail">{r['Detay']}</div></div>""", unsafe_allow_html=True)
-            st.markdown('</div>', unsafe_allow_html=True)
-        with tab_all: render_timeline(master_log)
-        with tab_ders: render_timeline(master_log[(master_log["Tip"] == "Ders") & (master_log["Ogrenci"] != "Misafir")])
-        with tab_finans: render_timeline(master_log[master_log["Tip"].isin(["Para", "Gider"])])
-        with tab_sys: render_timeline(master_log[master_log["Tip"] == "Ziyaret"])
-    else: st.info("Henüz bir hareketlilik yok.")
+    donemler = arsiv_donemleri()
+    donem = st.selectbox("Dönem", ["Güncel"] + donemler) if donemler else "Güncel"
+    gorunum = gecmis_gorunumu(df_logs, df_finans) if donem == "Güncel" else arsiv_gorunumu(donem)
+    # Sadece seçili görünüm hesaplanır (sekmelerde hepsi her seferinde çizilirdi)
+    sekme = st.radio("Görünüm", list(GECMIS_FILTRELERI) + ["👀 Ziyaretçi Logu"], horizontal=True, label_visibility="collapsed")
+    if sekme in GECMIS_FILTRELERI:
+        filtre = GECMIS_FILTRELERI[sekme]
+        toplam = len(gorunum.filtreli(filtre))
+        if toplam:
+            sayfa_anahtari = f"gecmis_sayfa_{donem}_{filtre}"
+            sayfa_sayisi = min(st.session_state.get(sayfa_anahtari, 1), -(-toplam // SAYFA_BOYU))
+            govde = "".join(gorunum.sayfa_html(filtre, no) for no in range(sayfa_sayisi))
+            st.markdown(f'<div class="timeline-container">{govde}</div>', unsafe_allow_html=True)
+            st.caption(f"{min(sayfa_sayisi * SAYFA_BOYU, toplam)} / {toplam} kayıt")
+            if sayfa_sayisi * SAYFA_BOYU < toplam:
+                st.button("⬇️ DAHA FAZLA", on_click=_sonraki_sayfa, args=(sayfa_anahtari,))
+        else: st.info("Bu kategoride kayıt yok.")
+    else:
+        df_ziyaret = veriler["Ziyaretci_Istatistik"]
+        if not df_ziyaret.empty:
+            df_ziyaret = df_ziyaret.groupby("Tarih", as_index=False)["Ziyaret"].sum().sort_values("Tarih", ascending=False)
+            c1, c2 = st.columns(2)
+            c1.metric("BUGÜN", f"{df_ziyaret.loc[df_ziyaret['Tarih'] == datetime.now().strftime('%Y-%m-%d'), 'Ziyaret'].sum():,}")
+            c2.metric("TOPLAM", f"{df_ziyaret['Ziyaret'].sum():,}")
+            st.bar_chart(df_ziyaret.head(30).set_index("Tarih")["Ziyaret"].sort_index())
+            st.dataframe(df_ziyaret, use_container_width=True, hide_index=True)
+        else: st.info("Henüz ziyaret istatistiği yok.")
 
 elif menu == "📅 Çizelge":
-    df_prog = get_data_cached("Ders_Programi", COL_PROG)
+    df_prog = veriler["Ders_Programi"]
     if IS_ADMIN:
         ed = st.data_editor(df_prog, use_container_width=True, hide_index=True)
-        if not df_prog.equals(ed): save_data(df_prog, "Ders_Programi", COL_PROG)
+        if not df_prog.equals(ed): save_data(ed, "Ders_Programi", COL_PROG)
     else: st.dataframe(df_prog, use_container_width=True)
+
+elif menu == "⏱️ Diagnostics":
+    st.markdown("<h2 style='color: white;'>⏱️ Diagnostics</h2>", unsafe_allow_html=True)
+    rapor = olcum().rapor()
+    turlar = pd.DataFrame(rapor["turlar"], columns=["zaman", "sayfa", "ms", "api"])
+    onb = rapor["onbellek"]
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Çalıştırma", len(turlar))
+    c2.metric("API / Çalıştırma", f"{turlar['api'].mean():.1f}" if len(turlar) else "-")
+    c3.metric("Önbellek İsabeti", f"%{onb['oran'] * 100:.0f}" if onb["oran"] is not None else "-")
+    c4.metric("Çalıştırma p50", f"{turlar['ms'].median():.0f} ms" if len(turlar) else "-")
+    st.caption(f"Ölçüm başlangıcı: {rapor['baslangic']} · Önbellek: {onb['isabet']} isabet, {onb['kuyruk']} kuyruk, {onb['iska']} ıska")
+
+    st.markdown("##### Gecikmeler")
+    st.dataframe(pd.DataFrame(rapor["gecikmeler"]), use_container_width=True, hide_index=True)
+    st.markdown("##### Yük Boyutları (hücre)")
+    st.dataframe(pd.DataFrame(rapor["yukler"]), use_container_width=True, hide_index=True)
+    if rapor["sayaclar"]:
+        st.markdown("##### Sayaçlar")
+        st.dataframe(pd.DataFrame(list(rapor["sayaclar"].items()), columns=["ad", "adet"]), use_container_width=True, hide_index=True)
+    st.markdown("##### Son Çalıştırmalar")
+    st.dataframe(turlar.iloc[::-1], use_container_width=True, hide_index=True)
+
+    c1, c2 = st.columns(2)
+    c1.download_button("📥 JSON İndir", olcum().json(), file_name=f"diagnostics_{datetime.now().strftime('%Y%m%d_%H%M')}.json", mime="application/json")
+    if c2.button("🧹 Ölçümleri Sıfırla"): olcum().sifirla(); yeniden_yukle()
+
+olcum().kaydet(f"sayfa.{menu}", time.perf_counter() - sayfa_baslangic)
+
+# Bu çalıştırmada biriken yazmaları gönder
+try: tampon.gonder()
+except SatirKaydi as e: st.error(str(e))
+olcum().tur_bitir(menu)
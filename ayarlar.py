@@ -0,0 +1,5 @@
+# --- AYARLAR ---
+# Uygulamanın ve kıyaslamanın (bench/calistir.py) paylaştığı ayarlar.
+
+# --- YÖNETİCİ ŞİFRESİ ---
+ADMIN_SIFRE = "1234"
@@ -0,0 +1,229 @@
+# --- KIYASLAMA ---
+# Canlı Google hesabı olmadan performans ölçümü. app.py, streamlit AppTest ile sahte
+# Sheets (sahte_sheets.SahteTablo) üzerinde çalıştırılır; her veri boyutu için sayfalar
+# soğuk (önbellek boş) ve sıcak açılır, yazma işlemleri tetiklenir. Her adım için
+# çalıştırma süresi, API istek sayısı, tracemalloc tepe belleği ve adımdan sonra Arrow'da
+# tutulan bellek (pyarrow varsa) raporlanır.
+#
+#   python bench/calistir.py                          # 100, 10k, 100k satır
+#   python bench/calistir.py --boyut 10000 --gecikme 0.08 --okuma-kotasi 60 --json sonuc.json
+#
+# Çizelge düzenlemesi (st.data_editor) AppTest ile girilemediği için sadece sayfa açılışı ölçülür.
+import argparse
+import gc
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest import mock
+
+import gspread
+import pandas as pd
+import streamlit as st
+from oauth2client.service_account import ServiceAccountCredentials
+from streamlit.testing.v1 import AppTest
+
+try: import pyarrow as pa  # pandas'ın str sütunları Arrow belleğinde; tracemalloc bunları görmez
+except ImportError: pa = None
+
+APP = Path(__file__).resolve().parent.parent / "app.py"
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(APP.parent))
+from ayarlar import ADMIN_SIFRE
+from depo import COL_FINANS, COL_LOG, COL_OGRENCI, COL_PROG, COL_ZIYARET, SADECE_EKLENEN, AnlikDepo, SheetsDepo
+from sahte_sheets import SahteTablo
+
+SAYFALAR = ["🏠 Kort Paneli", "👥 Sporcular", "💸 Kasa", "📝 Geçmiş", "📅 Çizelge"]
+
+
+# --- VERİ ÜRETİMİ ---
+def veri_uret(n, tohum=0):
+    # n ders kaydı + n finans kaydı; oyuncu sayısı kayıtla birlikte büyür (50 kayıt / oyuncu)
+    rng = random.Random(tohum)
+    oyuncular = [f"Oyuncu {i:05d}" for i in range(max(10, n // 50))]
+    ogrenci = [[ad, "10", str(rng.randint(0, 10)), "-", "Aktif" if rng.random() < 0.8 else "Pasif", rng.choice(["Ödendi", "Ödenmedi"]), "-"] for ad in oyuncular]
+    bugun = datetime.now()
+    zamanlar = sorted(bugun - timedelta(minutes=rng.randint(0, 365 * 24 * 60)) for _ in range(n))
+    log = [[z.strftime("%d-%m-%Y"), z.strftime("%H:%M"), rng.choice(oyuncular), islem, f"Kalan: {rng.randint(0, 10)}"]
+           for z, islem in zip(zamanlar, rng.choices(["Ders İşlendi", "Geri Alındı", "Paket Yüklendi", "Yeni Kayıt"], [85, 5, 7, 3], k=n))]
+    finans = [[z.strftime("%Y-%m-%d"), z.strftime("%Y-%m"), rng.choice(oyuncular), str(rng.choice([200, 500, 1000, 1500])), "Ders Ödemesi", tip]
+              for z, tip in zip(sorted(bugun - timedelta(days=rng.randint(0, 365)) for _ in range(n)), rng.choices(["Gelir", "Gider"], [85, 15], k=n))]
+    program = [[f"{h:02d}:00"] + [rng.choice(oyuncular) if rng.random() < 0.3 else "" for _ in range(7)] for h in range(8, 24)]
+    ziyaret = [[(bugun - timedelta(days=i)).strftime("%Y-%m-%d"), str(rng.randint(5, 80))] for i in range(30, 0, -1)]
+    return {"Ogrenci_Data": [COL_OGRENCI] + ogrenci, "Finans_Kasa": [COL_FINANS] + finans, "Ders_Gecmisi": [COL_LOG] + log,
+            "Ders_Programi": [COL_PROG] + program, "Ziyaretci_Istatistik": [COL_ZIYARET] + ziyaret}
+
+
+# --- OTURUM ---
+class _Istemci:
+    def __init__(self, tablo): self.tablo = tablo
+    def open(self, ad): return self.tablo
+
+
+def onbellekleri_temizle():
+    # app.py'nin süreç geneli durumu (depo, sayfa önbelleği, indeksler) sıfırlanır
+    st.cache_resource.clear(); st.cache_data.clear()
+
+
+class Oturum:
+    def __init__(self, tablo, zaman_asimi):
+        self.tablo = tablo
+        self.at = AppTest.from_file(str(APP), default_timeout=zaman_asimi)
+        self.at.secrets["gcp_service_account"] = {"private_key": "sahte"}
+        self._calistir(self.at.run)
+        self._calistir(lambda: self._giris().input(ADMIN_SIFRE).run())
+
+    def _giris(self):
+        return next(t for t in self.at.text_input if t.label == "Şifre")
+
+    def _calistir(self, adim):
+        adim()
+        if self.at.exception: raise RuntimeError(f"Uygulama hatası: {self.at.exception[0].message}")
+
+    def olc(self, adim, bellek=False):
+        self.tablo.sifirla_sayac()
+        if bellek: gc.collect()  # temizlenen önbelleklerin tabloları ölçüme karışmasın
+        arrow = pa.total_allocated_bytes() if bellek and pa else None
+        if bellek: tracemalloc.start()
+        t = time.perf_counter()
+        try: self._calistir(adim)
+        finally:
+            sure = time.perf_counter() - t
+            tepe = tracemalloc.get_traced_memory()[1] if bellek else None
+            if bellek: tracemalloc.stop()
+            if arrow is not None: arrow = pa.total_allocated_bytes() - arrow
+        mb = lambda x: round(x / 2**20, 1) if x is not None else None
+        return {"ms": round(sure * 1000, 1), "api": self.tablo.toplam_cagri(), "cagrilar": dict(self.tablo.cagrilar),
+                "reddedilen": self.tablo.reddedilen, "tepe_mb": mb(tepe), "arrow_mb": mb(arrow)}
+
+    # --- Adımlar ---
+    def sayfaya_git(self, sayfa):
+        return lambda: self.at.sidebar.radio[0].set_value(sayfa).run()
+
+    def yenile(self):
+        return self.at.run
+
+    def _sec(self, etiket, deger):
+        next(s for s in self.at.selectbox if s.label == etiket).set_value(deger)
+
+    def _dugme(self, etiket):
+        return next(b for b in self.at.button if b.label == etiket)
+
+    def ders_isle(self, oyuncu):
+        def adim():
+            self._sec("Oyuncu Seç", oyuncu); self.at.run()
+            self._dugme("✅ DERS TAMAMLANDI (-1)").click().run()
+        return adim
+
+    def profil_kaydet(self, oyuncu):
+        def adim():
+            self._sec("Oyuncu Seç", oyuncu); self.at.run()
+            next(n for n in self.at.number_input if n.label == "Tahsilat Yap (TL)").set_value(500.0)
+            self._dugme("KAYDET").click().run()
+        return adim
+
+    def yeni_kayit(self, ad):
+        def adim():
+            next(t for t in self.at.text_input if t.label == "Ad Soyad").input(ad)
+            self._dugme("EKLE").click().run()
+        return adim
+
+    def kasa_girisi(self):
+        def adim():
+            next(n for n in self.at.number_input if n.label == "Tutar").set_value(750.0)
+            self._dugme("EKLE").click().run()
+        return adim
+
+
+# --- SENARYO ---
+def sahte_baglanti(tablo):
+    # baglanti_kur() içindeki kimlik doğrulama ve client.open sahte tabloya yönlenir
+    yamalar = [mock.patch.object(gspread, "authorize", lambda creds: _Istemci(tablo)),
+               mock.patch.object(ServiceAccountCredentials, "from_json_keyfile_dict", classmethod(lambda cls, *a, **k: None)),
+               mock.patch.object(ServiceAccountCredentials, "from_json_keyfile_name", classmethod(lambda cls, *a, **k: None))]
+    for y in yamalar: y.start()
+    return lambda: [y.stop() for y in yamalar]
+
+
+def boyut_calistir(n, args):
+    tablo = SahteTablo(args.gecikme, args.hucre_gecikmesi, args.okuma_kotasi, args.yazma_kotasi)
+    veri = veri_uret(n, args.tohum)
+    for ad, satirlar in veri.items(): tablo.yukle(ad, satirlar)
+    if args.anlik:
+        # Yenileyici (yenileyici.py) görüntüleri baştan yazmış gibi; uygulama süreçleri görüntüsü olmayan sayfayı yazmaz
+        for yol in Path(args.anlik).glob("*"): yol.unlink()
+        AnlikDepo(lambda: SheetsDepo(tablo), args.anlik, SADECE_EKLENEN).esitle()
+        tablo.sifirla_sayac()
+    kapat = sahte_baglanti(tablo)
+    try: return _senaryo(tablo, veri, n, args)
+    finally: kapat(); onbellekleri_temizle()
+
+
+def _senaryo(tablo, veri, n, args):
+    aktif = next(r[0] for r in veri["Ogrenci_Data"][1:] if r[4] == "Aktif")
+    sonuclar = []
+
+    def kaydet(adim, olcum):
+        olcum.update(boyut=n, adim=adim); sonuclar.append(olcum)
+        print(f"  {adim:<34} {olcum['ms']:>9.1f} ms  api={olcum['api']:<3}" + (f"  tepe={olcum['tepe_mb']} MB" if olcum["tepe_mb"] is not None else "")
+              + (f"  arrow={olcum['arrow_mb']} MB" if olcum["arrow_mb"] is not None else ""), flush=True)
+
+    onbellekleri_temizle()
+    o = Oturum(tablo, args.zaman_asimi)
+    for sayfa in SAYFALAR:
+        onbellekleri_temizle()
+        kaydet(f"{sayfa} (soğuk)", o.olc(o.sayfaya_git(sayfa)))
+        sicak = [o.olc(o.yenile()) for _ in range(args.tekrar)]
+        kaydet(f"{sayfa} (sıcak)", {**sicak[-1], "ms": round(statistics.median(s["ms"] for s in sicak), 1), "api": max(s["api"] for s in sicak)})
+        if args.bellek:
+            o.olc(o.sayfaya_git("📅 Çizelge" if sayfa != "📅 Çizelge" else SAYFALAR[0]))
+            onbellekleri_temizle()
+            kaydet(f"{sayfa} (bellek)", o.olc(o.sayfaya_git(sayfa), bellek=True))
+
+    o.olc(o.sayfaya_git("🏠 Kort Paneli"))
+    kaydet("Yazma: ders işle", o.olc(o.ders_isle(aktif)))
+    o.olc(o.sayfaya_git("👥 Sporcular"))
+    kaydet("Yazma: profil kaydet", o.olc(o.profil_kaydet(aktif)))
+    kaydet("Yazma: yeni kayıt", o.olc(o.yeni_kayit(f"Kıyas {n}")))
+    o.olc(o.sayfaya_git("💸 Kasa"))
+    kaydet("Yazma: kasa girişi", o.olc(o.kasa_girisi()))
+    return sonuclar
+
+
+def main():
+    p = argparse.ArgumentParser(description="CourtMaster çevrimdışı kıyaslama (sahte Google Sheets)")
+    p.add_argument("--boyut", type=int, nargs="+", default=[100, 10_000, 100_000], help="ders ve finans kaydı sayıları")
+    p.add_argument("--tekrar", type=int, default=3, help="sıcak çalıştırma tekrarı (medyan raporlanır)")
+    p.add_argument("--gecikme", type=float, default=0.0, help="istek başına sabit gecikme (sn)")
+    p.add_argument("--hucre-gecikmesi", type=float, default=0.0, help="taşınan hücre başına gecikme (sn)")
+    p.add_argument("--okuma-kotasi", type=int, default=None, help="dakikalık okuma kotası (varsayılan sınırsız)")
+    p.add_argument("--yazma-kotasi", type=int, default=None, help="dakikalık yazma kotası (varsayılan sınırsız)")
+    p.add_argument("--bellek", action=argparse.BooleanOptionalAction, default=True, help="sayfa başına tracemalloc ölçümü")
+    p.add_argument("--tohum", type=int, default=0)
+    p.add_argument("--zaman-asimi", type=float, default=600, help="tek çalıştırma için AppTest zaman aşımı (sn)")
+    p.add_argument("--anlik", help="paylaşılan görüntü dizini (COURTMASTER_ANLIK); her boyutta baştan eşitlenir")
+    p.add_argument("--json", help="sonuçların yazılacağı dosya")
+    args = p.parse_args()
+
+    os.environ.pop("COURTMASTER_SQLITE", None)  # her zaman Sheets yolu ölçülür
+    if args.anlik: os.environ["COURTMASTER_ANLIK"] = args.anlik
+    else: os.environ.pop("COURTMASTER_ANLIK", None)
+    sonuclar = []
+    for n in args.boyut:
+        print(f"== {n:,} satır", flush=True)
+        sonuclar += boyut_calistir(n, args)
+
+    tablo = pd.DataFrame(sonuclar)[["boyut", "adim", "ms", "api", "reddedilen", "tepe_mb", "arrow_mb"]]
+    print("\n" + tablo.to_string(index=False))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"tarih": datetime.now().isoformat(timespec="seconds"), "ayarlar": vars(args), "sonuclar": sonuclar}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+# --- SAHTE GOOGLE SHEETS ---
+# Uygulamanın kullandığı gspread Spreadsheet/Worksheet yüzeyinin bellek içi taklidi.
+# Her istek sayılır, isteğe bağlı sabit + hücre başına gecikme eklenir ve dakikalık
+# okuma/yazma kotası aşılınca gerçek API gibi 429 APIError fırlatılır.
+import threading
+import time
+from collections import Counter, deque
+
+import gspread
+from gspread.utils import a1_to_rowcol, rowcol_to_a1
+
+OKUMALAR = {"worksheet", "worksheets", "get_all_values", "get", "values_batch_get", "get_lastUpdateTime"}
+
+
+class _Cevap:
+    # APIError'ın beklediği requests.Response yerine
+    def __init__(self, kod, mesaj, durum):
+        self.status_code, self.text, self.durum = kod, mesaj, durum
+
+    def json(self):
+        return {"error": {"code": self.status_code, "message": self.text, "status": self.durum}}
+
+
+class SahteTablo:
+    def __init__(self, gecikme=0.0, hucre_gecikmesi=0.0, okuma_kotasi=None, yazma_kotasi=None):
+        self.gecikme, self.hucre_gecikmesi = gecikme, hucre_gecikmesi
+        self.kotalar = {"okuma": okuma_kotasi, "yazma": yazma_kotasi}  # None = sınırsız
+        self.pencereler = {"okuma": deque(), "yazma": deque()}
+        self.sayfalar = {}  # ad -> SahteSayfa (sıralı)
+        self.cagrilar = Counter()
+        self.reddedilen = 0
+        self.kilit = threading.Lock()
+        self._sonraki_id = 1
+        self.degisim = time.time()
+
+    # --- İstek muhasebesi ---
+    def _istek(self, ad, hucre=0):
+        tur = "okuma" if ad in OKUMALAR else "yazma"
+        with self.kilit:
+            kota, pencere, simdi = self.kotalar[tur], self.pencereler[tur], time.monotonic()
+            while pencere and simdi - pencere[0] > 60: pencere.popleft()
+            if kota is not None and len(pencere) >= kota:
+                self.reddedilen += 1
+                raise gspread.exceptions.APIError(_Cevap(429, f"Quota exceeded for {tur} requests per minute", "RESOURCE_EXHAUSTED"))
+            pencere.append(simdi)
+            self.cagrilar[ad] += 1
+            if tur == "yazma": self.degisim = time.time()
+        bekle = self.gecikme + hucre * self.hucre_gecikmesi
+        if bekle: time.sleep(bekle)
+
+    def sifirla_sayac(self):
+        with self.kilit: self.cagrilar.clear(); self.reddedilen = 0
+
+    def toplam_cagri(self):
+        return sum(self.cagrilar.values())
+
+    def yukle(self, ad, satirlar):
+        # Kıyaslama verisini istek saymadan yerleştirir
+        ws = self.sayfalar.get(ad) or self._yeni_sayfa(ad)
+        ws.satirlar = [[str(x) for x in r] for r in satirlar]
+        return ws
+
+    def _yeni_sayfa(self, ad, sheet_id=None):
+        if sheet_id is None: sheet_id, self._sonraki_id = self._sonraki_id, self._sonraki_id + 1
+        ws = SahteSayfa(self, ad, sheet_id)
+        self.sayfalar[ad] = ws
+        return ws
+
+    def _id_ile(self, sheet_id):
+        return next(ws for ws in self.sayfalar.values() if ws.id == sheet_id)
+
+    # --- gspread.Spreadsheet yüzeyi ---
+    def get_lastUpdateTime(self):
+        self._istek("get_lastUpdateTime")
+        return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(self.degisim)) + f".{int(self.degisim * 1000) % 1000:03d}Z"
+
+    def worksheet(self, ad):
+        self._istek("worksheet")
+        if ad not in self.sayfalar: raise gspread.exceptions.WorksheetNotFound(ad)
+        return self.sayfalar[ad]
+
+    def worksheets(self):
+        self._istek("worksheets")
+        return list(self.sayfalar.values())
+
+    def add_worksheet(self, title, rows=1000, cols=20, **kwargs):
+        self._istek("add_worksheet")
+        return self._yeni_sayfa(title)
+
+    def del_worksheet(self, ws):
+        self._istek("del_worksheet")
+        self.sayfalar.pop(ws.title, None)
+
+    def values_batch_get(self, ranges, params=None):
+        sonuc = []
+        for aralik in ranges:
+            ad, _, a1 = aralik.rpartition("!") if "!" in aralik else (aralik, "", "")
+            ad = ad.strip("'").replace("''", "'")
+            if ad not in self.sayfalar: raise gspread.exceptions.APIError(_Cevap(400, f"Unable to parse range: {aralik}", "INVALID_ARGUMENT"))
+            sonuc.append({"range": aralik, "values": self.sayfalar[ad]._aralik(a1)})
+        self._istek("values_batch_get", sum(len(r) for v in sonuc for r in v["values"]))
+        return {"spreadsheetId": "sahte", "valueRanges": sonuc}
+
+    def batch_update(self, body):
+        istekler = body.get("requests", [])
+        self._istek("batch_update", sum(len(r["values"]) for i in istekler for r in i.get("updateCells", {}).get("rows", [])))
+        for istek in istekler:
+            (tur, govde), = istek.items()
+            if tur == "deleteDimension":
+                r = govde["range"]; ws = self._id_ile(r["sheetId"])
+                del ws.satirlar[r["startIndex"]:r["endIndex"]]
+            elif tur == "updateSheetProperties":
+                p = govde["properties"]; ws = self._id_ile(p["sheetId"])
+                self.sayfalar.pop(ws.title); ws.title = p["title"]; self.sayfalar[ws.title] = ws
+            elif tur == "addSheet":
+                p = govde["properties"]
+                if p["title"] in self.sayfalar:
+                    raise gspread.exceptions.APIError(_Cevap(400, f'Invalid requests[0].addSheet: A sheet with the name "{p["title"]}" already exists. Please enter another name.', "INVALID_ARGUMENT"))
+                self._yeni_sayfa(p["title"], p.get("sheetId"))
+            elif tur == "updateCells":
+                ws = self._id_ile(govde["start"]["sheetId"])
+                ws.satirlar = [[str(next(iter(h.get("userEnteredValue", {"stringValue": ""}).values()))) for h in r["values"]] for r in govde["rows"]]
+            elif tur == "deleteSheet":
+                self.sayfalar.pop(self._id_ile(govde["sheetId"]).title)
+            else: raise NotImplementedError(tur)
+        return {"replies": [{} for _ in istekler]}
+
+
+class SahteSayfa:
+    col_count = 20
+
+    def __init__(self, tablo, title, sheet_id):
+        self.tablo, self.title, self.id = tablo, title, sheet_id
+        self.satirlar = []
+
+    def _aralik(self, a1):
+        # "" -> tüm sayfa, "A5:T" -> 5. satırdan sona, "B2:B" -> tek sütun, "A7" -> tek hücre (uygulamanın kullandığı biçimler)
+        if not a1: return [list(r) for r in self.satirlar]
+        bas, _, son = a1.partition(":")
+        satir, sutun = a1_to_rowcol(bas)
+        if not son: return [r[sutun - 1:sutun] for r in self.satirlar[satir - 1:satir] if r[sutun - 1:sutun]]
+        son_sutun = a1_to_rowcol(f"{son.rstrip('0123456789')}1")[1] if son else sutun
+        return [r[sutun - 1:son_sutun] for r in self.satirlar[satir - 1:]]
+
+    def get_all_values(self, **kwargs):
+        self.tablo._istek("get_all_values", sum(map(len, self.satirlar)))
+        return [list(r) for r in self.satirlar]
+
+    def get(self, range_name=None, **kwargs):
+        satirlar = self._aralik(range_name)
+        self.tablo._istek("get", sum(map(len, satirlar)))
+        return satirlar
+
+    def append_row(self, values, **kwargs):
+        self.tablo._istek("append_row", len(values))
+        self.satirlar.append([str(x) for x in values])
+
+    def append_rows(self, values, **kwargs):
+        self.tablo._istek("append_rows", sum(map(len, values)))
+        self.satirlar += [[str(x) for x in r] for r in values]
+
+    def update(self, values=None, range_name=None, **kwargs):
+        # Eski yazma yolu: A1'den başlayarak verilen satırları yazar
+        self.tablo._istek("update", sum(map(len, values or [])))
+        satir, sutun = a1_to_rowcol(range_name.split(":")[0]) if range_name else (1, 1)
+        self._yaz(satir, sutun, values or [])
+
+    def batch_update(self, data, **kwargs):
+        self.tablo._istek("batch_update", sum(len(r) for d in data for r in d["values"]))
+        for d in data:
+            satir, sutun = a1_to_rowcol(d["range"].split(":")[0])
+            self._yaz(satir, sutun, d["values"])
+
+    def clear(self):
+        self.tablo._istek("clear")
+        self.satirlar = []
+
+    def _yaz(self, satir, sutun, degerler):
+        for i, r in enumerate(degerler):
+            while len(self.satirlar) < satir + i: self.satirlar.append([])
+            hedef = self.satirlar[satir + i - 1]
+            for j, v in enumerate(r):
+                while len(hedef) < sutun + j: hedef.append("")
+                hedef[sutun + j - 1] = str(v)
+
+    def __repr__(self):
+        return f"<SahteSayfa {self.title!r} id:{self.id} {rowcol_to_a1(max(len(self.satirlar), 1), self.col_count)}>"
@@ -0,0 +1,599 @@
+# --- VERİ DEPOSU ---
+# Uygulama verisine sadece bu arayüz üzerinden erişir. Satır ve sütun numaraları
+# 0'dan başlar ve başlık satırını saymaz (satır 0 = ilk veri satırı).
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from urllib.parse import quote, unquote
+
+import gspread
+import pandas as pd
+from oauth2client.service_account import ServiceAccountCredentials
+
+try: import pyarrow as pa
+except ImportError: pa = None  # sadece AnlikDepo için gerekli
+
+# --- SÜTUN YAPILARI ---
+# Uygulama, yenileyici ve kıyaslama aynı şemaları buradan alır
+COL_OGRENCI = ["Ad Soyad", "Paket (Ders)", "Kalan Ders", "Son Islem", "Durum", "Odeme Durumu", "Notlar"]
+COL_FINANS = ["Tarih", "Ay", "Ogrenci", "Tutar", "Not", "Tip"]
+COL_LOG = ["Tarih", "Saat", "Ogrenci", "Islem", "Detay"]
+COL_PROG = ["Saat", "Pazartesi", "Salı", "Çarşamba", "Perşembe", "Cuma", "Cumartesi", "Pazar"]
+COL_ZIYARET = ["Tarih", "Ziyaret"]
+SEMALAR = {"Ogrenci_Data": COL_OGRENCI, "Finans_Kasa": COL_FINANS, "Ders_Gecmisi": COL_LOG, "Ders_Programi": COL_PROG, "Ziyaretci_Istatistik": COL_ZIYARET}
+SADECE_EKLENEN = {"Ders_Gecmisi", "Finans_Kasa", "Ziyaretci_Istatistik"}  # satırları sadece sona eklenen defterler
+
+# --- GOOGLE SHEETS BAĞLANTISI ---
+SCOPE = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
+
+def tablo_ac(kimlik, ad="CourtMaster_DB"):
+    # kimlik: servis hesabı bilgileri (dict, ör. st.secrets) ya da JSON anahtar dosyasının yolu
+    if isinstance(kimlik, (str, os.PathLike)):
+        creds = ServiceAccountCredentials.from_json_keyfile_name(kimlik, SCOPE)
+    else:
+        creds_dict = dict(kimlik)
+        if "private_key" in creds_dict: creds_dict["private_key"] = creds_dict["private_key"].replace("\\n", "\n")
+        creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, SCOPE)
+    return gspread.authorize(creds).open(ad)
+
+
+class Depo:
+    def oku(self, ad):
+        # Başlık dahil tüm satırlar (hücreler metin), sayfa yoksa None
+        raise NotImplementedError
+
+    def oku_kuyruk(self, ad, baslangic):
+        # baslangic. veri satırından sonuna kadar (başlıksız), sayfa yoksa []
+        raise NotImplementedError
+
+    def toplu_oku(self, istekler):
+        # istekler: {sayfa: None (tamamı, oku gibi) ya da baslangic (oku_kuyruk gibi)}
+        return {ad: self.oku(ad) if b is None else self.oku_kuyruk(ad, b) for ad, b in istekler.items()}
+
+    def toplu_tablo(self, istekler):
+        # toplu_oku gibi, ama satırlar sütunları 0..n-1 olan bir DataFrame olarak (sayfa yoksa None)
+        return {ad: None if s is None else pd.DataFrame(s) for ad, s in self.toplu_oku(istekler).items()}
+
+    def surumler(self, adlar):
+        # {sayfa: içerik sürümü}; sürümü değişmeyen sayfa yeniden okunmaz. None = bilinmiyor
+        return {ad: None for ad in adlar}
+
+    def revizyon(self):
+        # Bütün tablonun son değişiklik damgası, bilinmiyorsa None
+        return None
+
+    def hucreleri_oku(self, ad, hucreler):
+        # {(satir, sutun): deger} (metin, boş ya da sayfa dışı = ""); konumla yazmadan önce doğrulama için
+        raise NotImplementedError
+
+    def satir_ekle(self, ad, satirlar):
+        raise NotImplementedError
+
+    def hucre_guncelle(self, ad, hucreler):
+        # hucreler: {(satir, sutun): deger}
+        raise NotImplementedError
+
+    def satir_sil(self, ad, satirlar):
+        raise NotImplementedError
+
+    def sayfa_kur(self, ad, basliklar, satirlar=()):
+        # Sayfayı silip başlık ve verilen satırlarla yeniden oluşturur (sadece yönetici sıfırlaması)
+        raise NotImplementedError
+
+    def ekle_ya_da_kur(self, ad, basliklar, satirlar):
+        # Sayfa varsa satırları sona ekler; yoksa başlık ve satırlarla kurar. Var olan sayfayı
+        # hiçbir zaman silmez: aynı anda kuran iki süreçten biri sadece ekleme yapmış olur
+        raise NotImplementedError
+
+    def semalari_kur(self, semalar):
+        # semalar: {sayfa: (basliklar, satirlar)}; hepsini sayfa_kur gibi yeniden oluşturur
+        for ad, (basliklar, satirlar) in semalar.items(): self.sayfa_kur(ad, basliklar, satirlar)
+
+    def sayfa_listesi(self):
+        raise NotImplementedError
+
+
+# --- KUYRUK OKUMA ---
+# Sadece sona eklenen sayfalarda bilinen satır sayısından sonrası okunur. Kuyruk bir satır
+# geriden istenir; o satır bilinen son satır değilse sayfadan satır silinmiştir (arşivleme,
+# sıfırlama) ve sayfa baştan okunmalıdır. Sayfa önbelleği (app.py) ve AnlikDepo kullanır.
+def kuyruk_baslangici(satir):
+    # satir: bilinen veri satırı sayısı -> oku_kuyruk / toplu_oku başlangıcı
+    return max(satir - 1, 0)
+
+def ham_satir(hucreler):
+    # Karşılaştırma için hücreler metin, boşlar ""; sondaki boşlar atılır (Sheets onları döndürmez)
+    hucreler = ["" if pd.isna(h) else str(h) for h in hucreler]
+    while hucreler and hucreler[-1] == "": hucreler.pop()
+    return hucreler
+
+def yeni_satirlar(kuyruk, satir, son):
+    # kuyruk_baslangici(satir)'dan okunan satırlardan (liste ya da DataFrame) yeni olanlar.
+    # son: bilinen son satırın ham_satir'ı. Örtüşen satır tutmazsa None: sayfa baştan okunmalı
+    if not satir: return kuyruk
+    if not len(kuyruk): return None
+    ilk = kuyruk.iloc[0] if isinstance(kuyruk, pd.DataFrame) else kuyruk[0]
+    return kuyruk[1:] if ham_satir(ilk) == son else None
+
+
+# --- GOOGLE SHEETS ---
+# Sheets kotası kullanıcı başına dakikada 60 okuma ve 60 yazma isteğidir. Her istek önce
+# kendi kovasından jeton alır; 429 (ve okumalarda 5xx) gelirse artan beklemeyle tekrar denenir.
+class KotaSiniri:
+    def __init__(self, adet, sure=60.0):
+        self.kapasite, self.hiz = float(adet), adet / sure
+        self.jeton, self.son = float(adet), time.monotonic()
+        self.kilit = threading.Lock()
+
+    def al(self):
+        while True:
+            with self.kilit:
+                simdi = time.monotonic()
+                self.jeton = min(self.kapasite, self.jeton + (simdi - self.son) * self.hiz)
+                self.son = simdi
+                if self.jeton >= 1:
+                    self.jeton -= 1
+                    return
+                bekle = (1 - self.jeton) / self.hiz
+            time.sleep(bekle)
+
+
+def _hucre(v):
+    if isinstance(v, (int, float)) and not isinstance(v, bool): return {"userEnteredValue": {"numberValue": v}}
+    return {"userEnteredValue": {"stringValue": "" if v is None else str(v)}}
+
+
+class SheetsDepo(Depo):
+    def __init__(self, sheet, okuma_kotasi=60, yazma_kotasi=60, deneme=6, olcum=None, eksik_ttl=10):
+        self.sheet = sheet
+        self.olcum = olcum  # verilirse her API isteğinin süresi kaydedilir (olcum.Olcum)
+        self._sayfalar = {}  # worksheet() her çağrıda metadata isteği atar, nesneleri sakla
+        self._eksik = {}  # bulunamayan sayfa -> zaman; eksik_ttl saniye (ya da bir sonraki yazmaya) kadar tekrar aranmaz
+        self.eksik_ttl = eksik_ttl  # başka bir kopya sayfayı kurmuş olabilir, süre dolunca yeniden bakılır
+        self.okuma, self.yazma = KotaSiniri(okuma_kotasi), KotaSiniri(yazma_kotasi)
+        self.deneme = deneme
+
+    def _istek(self, sinir, tekrar_kodlari, fn, *args, **kwargs):
+        for deneme in range(self.deneme):
+            sinir.al()
+            t = time.perf_counter()
+            try:
+                sonuc = fn(*args, **kwargs)
+                if self.olcum: self.olcum.api(fn.__name__, time.perf_counter() - t)
+                return sonuc
+            except gspread.exceptions.APIError as e:
+                if self.olcum: self.olcum.api(fn.__name__, time.perf_counter() - t, hata=e.response.status_code)
+                if e.response.status_code not in tekrar_kodlari or deneme == self.deneme - 1: raise
+                time.sleep(min(2 ** deneme, 32) + random.random())
+
+    def _oku(self, fn, *args, **kwargs):
+        return self._istek(self.okuma, (429, 500, 502, 503, 504), fn, *args, **kwargs)
+
+    def _yaz(self, fn, *args, **kwargs):
+        # Yazmalar sadece 429'da tekrarlanır: 5xx'te istek işlenmiş olabilir, satır iki kez eklenmesin
+        return self._istek(self.yazma, (429,), fn, *args, **kwargs)
+
+    def _ws(self, ad):
+        if self._eksik_mi(ad): raise gspread.exceptions.WorksheetNotFound(ad)
+        if ad not in self._sayfalar:
+            try: self._sayfalar[ad] = self._oku(self.sheet.worksheet, ad)
+            except gspread.exceptions.WorksheetNotFound:
+                self._eksik[ad] = time.monotonic()
+                raise
+        return self._sayfalar[ad]
+
+    def _tum_sayfalar(self):
+        # Tek metadata isteğiyle bütün sayfa nesneleri
+        self._sayfalar = {ws.title: ws for ws in self._oku(self.sheet.worksheets)}
+        self._eksik = {}
+        return self._sayfalar
+
+    def _eksik_mi(self, ad):
+        t = self._eksik.get(ad)
+        return t is not None and time.monotonic() - t < self.eksik_ttl
+
+    def _yazildi(self):
+        # Yazmadan sonra eksik sayfalar yeniden aranır (sayfa bu arada kurulmuş olabilir)
+        self._eksik = {}
+
+    def _kuyruk_araligi(self, ws, baslangic):
+        son_sutun = gspread.utils.rowcol_to_a1(1, ws.col_count).rstrip("0123456789")
+        return f"A{baslangic + 2}:{son_sutun}"
+
+    def oku(self, ad):
+        try: ws = self._ws(ad)
+        except gspread.exceptions.WorksheetNotFound: return None
+        return self._oku(ws.get_all_values)
+
+    def oku_kuyruk(self, ad, baslangic):
+        try: ws = self._ws(ad)
+        except gspread.exceptions.WorksheetNotFound: return []
+        return self._oku(ws.get, self._kuyruk_araligi(ws, baslangic))
+
+    def toplu_oku(self, istekler):
+        # Bütün sayfalar tek values_batch_get isteğiyle
+        sayfalar = self._sayfalar if all(ad in self._sayfalar or self._eksik_mi(ad) for ad in istekler) else self._tum_sayfalar()
+        simdi = time.monotonic()
+        for ad in istekler:
+            if ad not in sayfalar: self._eksik.setdefault(ad, simdi)
+        mevcut = [ad for ad in istekler if ad in sayfalar]
+        sonuc = {ad: None if istekler[ad] is None else [] for ad in istekler if ad not in sayfalar}
+        if not mevcut: return sonuc
+        araliklar = [gspread.utils.absolute_range_name(ad, None if istekler[ad] is None else self._kuyruk_araligi(sayfalar[ad], istekler[ad]))
+                     for ad in mevcut]
+        cevap = self._oku(self.sheet.values_batch_get, araliklar)
+        for ad, aralik in zip(mevcut, cevap.get("valueRanges", [])): sonuc[ad] = aralik.get("values", [])
+        return sonuc
+
+    def hucreleri_oku(self, ad, hucreler):
+        # Sadece istenen hücreler, tek values_batch_get isteğiyle
+        hucreler = list(hucreler)
+        if not hucreler: return {}
+        self._ws(ad)  # sayfa yoksa WorksheetNotFound
+        araliklar = [gspread.utils.absolute_range_name(ad, gspread.utils.rowcol_to_a1(r + 2, c + 1)) for r, c in hucreler]
+        cevap = self._oku(self.sheet.values_batch_get, araliklar)
+        degerler = [(a.get("values") or [[""]])[0] for a in cevap.get("valueRanges", [])]
+        return {h: d[0] if d else "" for h, d in zip(hucreler, degerler)}
+
+    def satir_ekle(self, ad, satirlar):
+        ws = self._ws(ad)
+        self._yaz(ws.append_rows, [list(r) for r in satirlar])
+        self._yazildi()
+
+    def hucre_guncelle(self, ad, hucreler):
+        ws = self._ws(ad)
+        self._yaz(ws.batch_update, [{"range": gspread.utils.rowcol_to_a1(r + 2, c + 1), "values": [[v]]} for (r, c), v in hucreler.items()])
+        self._yazildi()
+
+    def satir_sil(self, ad, satirlar):
+        # Tek istekte, ardışık satırlar tek aralık olarak, alttan yukarı (üstteki satır numaraları kaymasın)
+        ws = self._ws(ad)
+        araliklar = []
+        for r in sorted(set(satirlar)):
+            if araliklar and araliklar[-1][1] == r: araliklar[-1][1] = r + 1
+            else: araliklar.append([r, r + 1])
+        istekler = [{"deleteDimension": {"range": {"sheetId": ws.id, "dimension": "ROWS", "startIndex": a + 1, "endIndex": b + 1}}}
+                    for a, b in reversed(araliklar)]
+        if istekler: self._yaz(self.sheet.batch_update, {"requests": istekler})
+        self._yazildi()
+
+    def sayfa_kur(self, ad, basliklar, satirlar=()):
+        self.semalari_kur({ad: (basliklar, satirlar)})
+
+    @staticmethod
+    def _kurma_istekleri(sheet_id, ad, basliklar, satirlar):
+        satirlar = [list(basliklar)] + [list(r) for r in satirlar]
+        return [{"addSheet": {"properties": {"sheetId": sheet_id, "title": ad, "gridProperties": {"rowCount": max(1000, len(satirlar)), "columnCount": max(20, len(basliklar))}}}},
+                {"updateCells": {"start": {"sheetId": sheet_id, "rowIndex": 0, "columnIndex": 0}, "rows": [{"values": [_hucre(v) for v in r]} for r in satirlar], "fields": "userEnteredValue"}}]
+
+    def ekle_ya_da_kur(self, ad, basliklar, satirlar):
+        try: self._ws(ad)
+        except gspread.exceptions.WorksheetNotFound:
+            # Sadece addSheet: sayfa bu arada başka süreçte kurulduysa istek 400 ile reddedilir, ekleme yapılır
+            try:
+                self._yaz(self.sheet.batch_update, {"requests": self._kurma_istekleri(random.randrange(1, 2**31 - 1), ad, basliklar, satirlar)})
+                self._yazildi()
+                return
+            except gspread.exceptions.APIError as e:
+                if e.response.status_code != 400 or "already exists" not in e.error.get("message", ""): raise
+                self._yazildi()
+        self.satir_ekle(ad, satirlar)
+
+    def semalari_kur(self, semalar):
+        # Tek batch_update: eski sayfalar geçici ada alınır (aynı adla yenisi eklenebilsin, hiç sayfa
+        # kalmaması durumu oluşmasın), yeniler eklenip doldurulur, en son eskiler silinir.
+        mevcut = self._tum_sayfalar()
+        kullanilan = {ws.id for ws in mevcut.values()}
+        istekler, silinecek = [], []
+        for ad in semalar:
+            if ad in mevcut:
+                ws = mevcut[ad]
+                istekler.append({"updateSheetProperties": {"properties": {"sheetId": ws.id, "title": f"_eski_{ws.id}"}, "fields": "title"}})
+                silinecek.append(ws.id)
+        for ad, (basliklar, satirlar) in semalar.items():
+            sheet_id = random.randrange(1, 2**31 - 1)
+            while sheet_id in kullanilan: sheet_id = random.randrange(1, 2**31 - 1)
+            kullanilan.add(sheet_id)
+            istekler += self._kurma_istekleri(sheet_id, ad, basliklar, satirlar)
+        istekler += [{"deleteSheet": {"sheetId": i}} for i in silinecek]
+        self._yaz(self.sheet.batch_update, {"requests": istekler})
+        self._sayfalar = {}
+        self._yazildi()
+
+    def sayfa_listesi(self):
+        return list(self._tum_sayfalar())
+
+    def revizyon(self):
+        # Drive'daki modifiedTime; hücre değişince ilerler (birkaç saniye gecikebilir)
+        return self._oku(self.sheet.get_lastUpdateTime)
+
+
+# --- SQLITE ---
+# Her sayfa bir tablo; satır sırası _sira sütunuyla korunur.
+def _q(ad):
+    return '"' + str(ad).replace('"', '""') + '"'
+
+
+class SqliteDepo(Depo):
+    INDEKS_SUTUNLARI = ("Ad Soyad", "Ogrenci", "Tarih", "Tip")
+
+    def __init__(self, yol, semalar):
+        self.semalar = dict(semalar)  # sayfa adı -> sütun listesi
+        self.kilit = threading.Lock()
+        self.db = sqlite3.connect(yol, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        with self.kilit, self.db:
+            for ad, sutunlar in self.semalar.items(): self._tablo_olustur(ad, sutunlar)
+
+    def _tablo_olustur(self, ad, sutunlar):
+        self.db.execute(f"CREATE TABLE IF NOT EXISTS {_q(ad)} (_sira INTEGER PRIMARY KEY AUTOINCREMENT, {', '.join(_q(c) for c in sutunlar)})")
+        for c in sutunlar:
+            if c in self.INDEKS_SUTUNLARI: self.db.execute(f"CREATE INDEX IF NOT EXISTS {_q(f'ix_{ad}_{c}')} ON {_q(ad)} ({_q(c)})")
+
+    def _sutunlar(self, ad):
+        # Şemada olmayan ama dosyada bulunan tablolar (önceki sayfa_kur'lar) da okunabilir
+        if ad not in self.semalar:
+            sutunlar = [r[1] for r in self.db.execute(f"PRAGMA table_info({_q(ad)})") if r[1] != "_sira"]
+            if not sutunlar: raise KeyError(f"Tanımsız sayfa: {ad}")
+            self.semalar[ad] = sutunlar
+        return self.semalar[ad]
+
+    def _siralar(self, ad):
+        return [r[0] for r in self.db.execute(f"SELECT _sira FROM {_q(ad)} ORDER BY _sira")]
+
+    def oku(self, ad):
+        with self.kilit:
+            try: sutunlar = self._sutunlar(ad)
+            except KeyError: return None
+            satirlar = self.db.execute(f"SELECT {', '.join(_q(c) for c in sutunlar)} FROM {_q(ad)} ORDER BY _sira").fetchall()
+        return [list(sutunlar)] + [["" if x is None else str(x) for x in r] for r in satirlar]
+
+    def oku_kuyruk(self, ad, baslangic):
+        with self.kilit:
+            try: sutunlar = self._sutunlar(ad)
+            except KeyError: return []
+            satirlar = self.db.execute(f"SELECT {', '.join(_q(c) for c in sutunlar)} FROM {_q(ad)} ORDER BY _sira LIMIT -1 OFFSET ?", (baslangic,)).fetchall()
+        return [["" if x is None else str(x) for x in r] for r in satirlar]
+
+    def hucreleri_oku(self, ad, hucreler):
+        with self.kilit:
+            sutunlar, siralar = self._sutunlar(ad), self._siralar(ad)
+            sonuc = {}
+            for r, c in hucreler:
+                satir = self.db.execute(f"SELECT {_q(sutunlar[c])} FROM {_q(ad)} WHERE _sira = ?", (siralar[r],)).fetchone() if r < len(siralar) else None
+                sonuc[(r, c)] = "" if satir is None or satir[0] is None else str(satir[0])
+            return sonuc
+
+    def satir_ekle(self, ad, satirlar):
+        with self.kilit, self.db:
+            sutunlar = self._sutunlar(ad)
+            satirlar = [(list(r) + [None] * len(sutunlar))[:len(sutunlar)] for r in satirlar]
+            self.db.executemany(f"INSERT INTO {_q(ad)} ({', '.join(_q(c) for c in sutunlar)}) VALUES ({', '.join('?' * len(sutunlar))})", satirlar)
+
+    def hucre_guncelle(self, ad, hucreler):
+        with self.kilit, self.db:
+            sutunlar = self._sutunlar(ad)
+            siralar = self._siralar(ad)
+            for (r, c), v in hucreler.items():
+                self.db.execute(f"UPDATE {_q(ad)} SET {_q(sutunlar[c])} = ? WHERE _sira = ?", (v, siralar[r]))
+
+    def satir_sil(self, ad, satirlar):
+        with self.kilit, self.db:
+            self._sutunlar(ad)
+            siralar = self._siralar(ad)
+            self.db.executemany(f"DELETE FROM {_q(ad)} WHERE _sira = ?", [(siralar[r],) for r in set(satirlar)])
+
+    def sayfa_kur(self, ad, basliklar, satirlar=()):
+        self.semalar[ad] = list(basliklar)
+        with self.kilit, self.db:
+            self.db.execute(f"DROP TABLE IF EXISTS {_q(ad)}")
+            self._tablo_olustur(ad, basliklar)
+        if satirlar: self.satir_ekle(ad, satirlar)
+
+    def ekle_ya_da_kur(self, ad, basliklar, satirlar):
+        with self.kilit, self.db:
+            try: self._sutunlar(ad)
+            except KeyError:
+                self.semalar[ad] = list(basliklar)
+                self._tablo_olustur(ad, basliklar)
+        self.satir_ekle(ad, satirlar)
+
+    def sayfa_listesi(self):
+        with self.kilit:
+            return [r[0] for r in self.db.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")]
+
+
+# --- PAYLAŞILAN ANLIK GÖRÜNTÜ ---
+# Aynı makinedeki bütün Streamlit süreçleri sayfaları bir dizindeki Arrow dosyalarından
+# (<sayfa>.arrow, bellek eşlemeli) okur; kaynağa (Sheets) sadece yazarken ve görüntüsü olmayan
+# sayfada gidilir, kimlik doğrulama da o ana kadar ertelenir. Dosyaları tek bir yenileyici süreç
+# (yenileyici.py) tablonun revizyonu değiştikçe esitle() ile günceller; bir süreç kendi yazdığı
+# sayfaları bir sonraki okumada kaynaktan çekip görüntüyü kendisi yeniler. Sadece sona eklenen
+# sayfalarda görüntüden sonraki kuyruk çekilip dosyanın sonuna eklenir. Dosyalar geçici
+# dosyaya yazılıp os.replace ile değiştirilir: okuyan süreç yarım dosya görmez. Uygulama
+# süreçleri sadece kendi yazdıkları sayfaları ve sadece okumalarından beri dosya
+# değişmediyse yazar; yenileyicinin daha yeni görüntüsünü eski bir okumayla ezmezler.
+_KOSULSUZ = object()
+
+class AnlikDepo(Depo):
+    LISTE = "_sayfalar.json"  # yenileyicinin yazdığı sayfa listesi
+
+    def __init__(self, kaynak, dizin, sadece_eklenen=()):
+        if pa is None: raise ImportError("AnlikDepo için pyarrow gerekli")
+        self._kaynak_kur, self._kaynak = kaynak, None  # kaynak: Depo döndüren fonksiyon
+        self.sadece_eklenen = set(sadece_eklenen)
+        self.dizin = Path(dizin)
+        self.dizin.mkdir(parents=True, exist_ok=True)
+        self.kilit = threading.Lock()
+        self.kirli = set()  # bu süreçte yazılan, görüntüsü henüz yenilenmemiş sayfalar
+
+    def kaynak(self):
+        with self.kilit:
+            if self._kaynak is None: self._kaynak = self._kaynak_kur()
+            return self._kaynak
+
+    def _yol(self, ad):
+        return self.dizin / f"{quote(ad, safe='')}.arrow"
+
+    # --- Görüntü dosyaları ---
+    @staticmethod
+    def _ozet(satirlar, onceki=""):
+        # Satır satır zincirlenir: kuyruğu eklenmiş görüntünün özeti, aynı içeriğin baştan
+        # yazılmış özetiyle aynı çıkar (tam eşitleme değişmeyen dosyaya dokunmaz)
+        for r in satirlar: onceki = hashlib.sha1((onceki + json.dumps(r, ensure_ascii=False)).encode()).hexdigest()
+        return onceki
+
+    def _yaz_anlik(self, ad, satirlar, beklenen=_KOSULSUZ):
+        # Başlık dahil satırları yazar; içerik aynıysa dosyaya dokunmaz (False). Yazdıysa True,
+        # dosya beklenen durumda değilse None (bkz. _dosyaya)
+        satirlar = [["" if h is None else str(h) for h in r] for r in satirlar]
+        ozet, yol = self._ozet(satirlar), self._yol(ad)
+        try:
+            with pa.memory_map(str(yol)) as f:
+                if (pa.ipc.open_file(f).schema.metadata or {}).get(b"ozet") == ozet.encode(): return False
+        except (FileNotFoundError, pa.ArrowInvalid): pass
+        return self._dosyaya(ad, self._arrow(satirlar, max(map(len, satirlar), default=0)), ozet, beklenen) or None
+
+    def _ekle_anlik(self, ad, tablo, satirlar, beklenen=_KOSULSUZ):
+        # Kuyruk satırlarını görüntünün sonuna ekler, özete devam eder. Satırlar görüntüden geniş olmamalı
+        satirlar = [["" if h is None else str(h) for h in r] for r in satirlar]
+        ozet = self._ozet(satirlar, (tablo.schema.metadata or {}).get(b"ozet", b"").decode())
+        yeni = pa.concat_tables([tablo.replace_schema_metadata(None), self._arrow(satirlar, tablo.num_columns)]).combine_chunks()
+        return self._dosyaya(ad, yeni, ozet, beklenen) or None
+
+    @staticmethod
+    def _arrow(satirlar, genislik):
+        return pa.table({str(i): pa.array([r[i] if i < len(r) else "" for r in satirlar], pa.string()) for i in range(genislik)})
+
+    def _dosyaya(self, ad, tablo, ozet, beklenen=_KOSULSUZ):
+        # beklenen verilirse (_durum, kaynak okunmadan önce alınmış) dosya o durumda değilse yazılmaz,
+        # False döner: arada başka süreç yazmış, onun görüntüsü kalır
+        yol = self._yol(ad)
+        tablo = tablo.replace_schema_metadata({"ozet": ozet, "zaman": time.strftime("%Y-%m-%dT%H:%M:%S")})
+        gecici = yol.with_name(f"{yol.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with pa.OSFile(str(gecici), "wb") as f, pa.ipc.new_file(f, tablo.schema) as yazici: yazici.write_table(tablo)
+        if beklenen is not _KOSULSUZ and self._durum(ad) != beklenen:
+            gecici.unlink(missing_ok=True)
+            return False
+        os.replace(gecici, yol)
+        return True
+
+    def _durum(self, ad):
+        # Dosya değişince (os.replace) inode/mtime değişir; görüntü yoksa None
+        try: st = os.stat(self._yol(ad))
+        except FileNotFoundError: return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _oku_anlik(self, ad):
+        # Sıfır kopya: tablo dosyanın bellek eşlemesine bakar. Görüntü yoksa None
+        try: return pa.ipc.open_file(pa.memory_map(str(self._yol(ad)))).read_all()
+        except FileNotFoundError: return None
+
+    @staticmethod
+    def _tabloya(tablo, baslangic=0):
+        df = tablo.slice(baslangic).to_pandas()
+        df.columns = range(df.shape[1])
+        return df
+
+    def surumler(self, adlar):
+        # Kirli sayfa her zaman okunur
+        return {ad: None if ad in self.kirli else self._durum(ad) for ad in adlar}
+
+    def esitle(self, adlar=None, tam=False, kosullu=False):
+        # Kaynaktan (varsayılan: bütün sayfalar) tek toplu okuma; sadece içeriği değişenler yazılır.
+        # Görüntüsü olan sadece-eklenen sayfalardan yalnız kuyruk çekilir (tam=True: hepsi baştan).
+        # kosullu=True: okumadan beri dosyası değişen sayfa yazılmaz ve kirli kalır.
+        # Bütün tablo eşitlenirken kaynakta artık olmayan sayfaların görüntüleri silinir.
+        kaynak = self.kaynak()
+        tumu = adlar is None
+        if tumu: adlar = kaynak.sayfa_listesi()
+        with self.kilit: self.kirli -= set(adlar)
+        beklenen = {ad: self._durum(ad) if kosullu else _KOSULSUZ for ad in adlar}
+        eldekiler = {} if tam else {ad: t for ad in adlar if ad in self.sadece_eklenen and (t := self._oku_anlik(ad)) is not None and t.num_rows}
+        veriler = kaynak.toplu_oku({ad: kuyruk_baslangici(eldekiler[ad].num_rows - 1) if ad in eldekiler else None for ad in adlar})
+        sonuclar, tekrar = {}, []
+        for ad, satirlar in veriler.items():
+            if ad not in eldekiler:
+                if satirlar is not None: sonuclar[ad] = self._yaz_anlik(ad, satirlar, beklenen[ad])
+                continue
+            tablo = eldekiler[ad]
+            son = ham_satir(tablo.slice(tablo.num_rows - 1).to_pylist()[0].values()) if tablo.num_rows > 1 else None
+            satirlar = yeni_satirlar(satirlar, tablo.num_rows - 1, son)
+            # Örtüşme tutmadı ya da sütun eklenmiş: baştan okunur
+            if satirlar is None or any(len(r) > tablo.num_columns for r in satirlar): tekrar.append(ad); continue
+            if satirlar: sonuclar[ad] = self._ekle_anlik(ad, tablo, satirlar, beklenen[ad])
+        if tekrar:
+            for ad, satirlar in kaynak.toplu_oku({ad: None for ad in tekrar}).items():
+                if satirlar is not None: sonuclar[ad] = self._yaz_anlik(ad, satirlar, beklenen[ad])
+        atlanan = [ad for ad, s in sonuclar.items() if s is None]
+        if atlanan:
+            with self.kilit: self.kirli.update(atlanan)
+        if tumu:
+            for yol in self.dizin.glob("*.arrow"):
+                if unquote(yol.stem) not in adlar: yol.unlink(missing_ok=True)
+            gecici = self.dizin / f"{self.LISTE}.{os.getpid()}.tmp"
+            gecici.write_text(json.dumps(adlar, ensure_ascii=False), encoding="utf-8")
+            os.replace(gecici, self.dizin / self.LISTE)
+        return [ad for ad, s in sonuclar.items() if s]
+
+    # --- Okuma: sıcak yol görüntüden ---
+    def toplu_tablo(self, istekler):
+        kirli = [ad for ad in istekler if ad in self.kirli]
+        if kirli: self.esitle(kirli, kosullu=True)
+        sonuc, yok = {}, {}
+        for ad, baslangic in istekler.items():
+            tablo = self._oku_anlik(ad)
+            if tablo is None: yok[ad] = baslangic
+            else: sonuc[ad] = self._tabloya(tablo, 0 if baslangic is None else baslangic + 1)
+        # Görüntüsü olmayan sayfalar (yenileyici henüz yazmamış ya da sayfa yok) kaynaktan, dosyaya yazılmadan
+        if yok: sonuc.update(self.kaynak().toplu_tablo(yok))
+        return sonuc
+
+    # Satır listesi isteyenler (arşivleme) kaynağı okur; görüntüye yazılmaz
+    def oku(self, ad):
+        return self.kaynak().oku(ad)
+
+    def oku_kuyruk(self, ad, baslangic):
+        return self.kaynak().oku_kuyruk(ad, baslangic)
+
+    def hucreleri_oku(self, ad, hucreler):
+        return self.kaynak().hucreleri_oku(ad, hucreler)
+
+    def toplu_oku(self, istekler):
+        return self.kaynak().toplu_oku(istekler)
+
+    # --- Yazma: kaynağa, görüntü bir sonraki okumada yenilenir ---
+    def _kirlet(self, *adlar):
+        with self.kilit: self.kirli.update(adlar)
+
+    def satir_ekle(self, ad, satirlar):
+        self.kaynak().satir_ekle(ad, satirlar); self._kirlet(ad)
+
+    def hucre_guncelle(self, ad, hucreler):
+        self.kaynak().hucre_guncelle(ad, hucreler); self._kirlet(ad)
+
+    def satir_sil(self, ad, satirlar):
+        self.kaynak().satir_sil(ad, satirlar); self._kirlet(ad)
+
+    def sayfa_kur(self, ad, basliklar, satirlar=()):
+        self.kaynak().sayfa_kur(ad, basliklar, satirlar); self._kirlet(ad)
+
+    def semalari_kur(self, semalar):
+        self.kaynak().semalari_kur(semalar); self._kirlet(*semalar)
+
+    def ekle_ya_da_kur(self, ad, basliklar, satirlar):
+        self.kaynak().ekle_ya_da_kur(ad, basliklar, satirlar); self._kirlet(ad)
+
+    def sayfa_listesi(self):
+        # Yenileyici çalışıyorsa listesi kullanılır, yoksa kaynağa sorulur
+        try: adlar = json.loads((self.dizin / self.LISTE).read_text(encoding="utf-8"))
+        except FileNotFoundError: return self.kaynak().sayfa_listesi()
+        return sorted(set(adlar) | self.kirli)
+
+    def revizyon(self):
+        return self.kaynak().revizyon()
@@ -0,0 +1,90 @@
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from datetime import datetime
+
+# --- ÖLÇÜM ---
+# Süreç genelinde hafif zamanlama ve sayaçlar. Her ölçüm adı için son `tutulan` süre
+# saklanır, yüzdelikler bunlardan hesaplanır. API çağrıları ayrıca o anki çalıştırmaya
+# (iş parçacığı başına) sayılır; arka plan iş parçacıklarının çağrıları tura yazılmaz.
+class Olcum:
+    def __init__(self, tutulan=500):
+        self.tutulan = tutulan
+        self.kilit = threading.Lock()
+        self._yerel = threading.local()
+        self.sifirla()
+
+    def sifirla(self):
+        with self.kilit:
+            self.sureler = defaultdict(lambda: deque(maxlen=self.tutulan))   # ad -> son süreler (sn)
+            self.boyutlar = defaultdict(lambda: deque(maxlen=self.tutulan))  # ad -> son yük boyutları (hücre)
+            self.sayaclar = defaultdict(int)                                 # ad -> adet
+            self.turlar = deque(maxlen=self.tutulan)                         # çalıştırma başına özet
+            self.baslangic = time.time()
+
+    def kaydet(self, ad, sure):
+        with self.kilit: self.sureler[ad].append(sure)
+
+    def boyut(self, ad, n):
+        with self.kilit: self.boyutlar[ad].append(n)
+
+    def say(self, ad, n=1):
+        with self.kilit: self.sayaclar[ad] += n
+
+    @contextmanager
+    def zamanla(self, ad):
+        t = time.perf_counter()
+        try: yield
+        finally: self.kaydet(ad, time.perf_counter() - t)
+
+    def sarmala(self, ad):
+        # Fonksiyon dekoratörü: her çağrının süresi `ad` altında
+        def dekorator(fn):
+            def sarili(*args, **kwargs):
+                with self.zamanla(ad): return fn(*args, **kwargs)
+            sarili.__name__, sarili.__doc__ = fn.__name__, fn.__doc__
+            return sarili
+        return dekorator
+
+    def api(self, ad, sure, hata=None):
+        self.kaydet(f"api.{ad}", sure)
+        if hata is not None: self.say(f"api_hata.{hata}")
+        if getattr(self._yerel, "api", None) is not None: self._yerel.api += 1
+
+    def tur_baslat(self):
+        self._yerel.api, self._yerel.t = 0, time.perf_counter()
+
+    def tur_bitir(self, sayfa):
+        if getattr(self._yerel, "api", None) is None: return
+        tur = {"zaman": datetime.now().strftime("%H:%M:%S"), "sayfa": sayfa, "ms": round((time.perf_counter() - self._yerel.t) * 1000, 1), "api": self._yerel.api}
+        with self.kilit: self.turlar.append(tur)
+        self._yerel.api = None
+
+    @staticmethod
+    def _yuzdelik(sirali, q):
+        return sirali[min(len(sirali) - 1, int(q * len(sirali)))]
+
+    def gecikmeler(self):
+        with self.kilit: kopya = {ad: sorted(s) for ad, s in self.sureler.items() if s}
+        return [{"ad": ad, "adet": len(s), "p50_ms": round(self._yuzdelik(s, 0.5) * 1000, 1), "p90_ms": round(self._yuzdelik(s, 0.9) * 1000, 1),
+                 "p99_ms": round(self._yuzdelik(s, 0.99) * 1000, 1), "max_ms": round(s[-1] * 1000, 1)} for ad, s in sorted(kopya.items())]
+
+    def yukler(self):
+        with self.kilit: kopya = {ad: list(b) for ad, b in self.boyutlar.items() if b}
+        return [{"ad": ad, "adet": len(b), "ortalama": round(sum(b) / len(b), 1), "max": max(b), "toplam": sum(b)} for ad, b in sorted(kopya.items())]
+
+    def onbellek_orani(self):
+        # Taze kayıt = isabet; kuyruk okuması kısmi isabet sayılmaz, ayrıca gösterilir
+        with self.kilit: isabet, kuyruk, iska = (self.sayaclar[f"onbellek.{k}"] for k in ("isabet", "kuyruk", "iska"))
+        toplam = isabet + kuyruk + iska
+        return {"isabet": isabet, "kuyruk": kuyruk, "iska": iska, "oran": round(isabet / toplam, 3) if toplam else None}
+
+    def rapor(self):
+        with self.kilit: turlar, sayaclar = list(self.turlar), dict(self.sayaclar)
+        return {"olusturma": datetime.now().isoformat(timespec="seconds"), "baslangic": datetime.fromtimestamp(self.baslangic).isoformat(timespec="seconds"),
+                "gecikmeler": self.gecikmeler(), "yukler": self.yukler(), "onbellek": self.onbellek_orani(), "sayaclar": sayaclar, "turlar": turlar}
+
+    def json(self):
+        return json.dumps(self.rapor(), ensure_ascii=False, indent=2)
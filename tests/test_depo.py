@@ -0,0 +1,204 @@
+import gspread
+import pytest
+
+import depo as depo_modulu
+from bench.sahte_sheets import SahteTablo, _Cevap
+from depo import SADECE_EKLENEN, AnlikDepo, KotaSiniri, SheetsDepo, SqliteDepo
+
+# --- SqliteDepo ---
+# Satır numaraları 0 tabanlıdır ve başlık satırını saymaz: oku()[1] == 0. veri satırı.
+
+SEMA = {"Ogrenci_Data": ["Ad Soyad", "Kalan Ders"], "Finans_Kasa": ["Tarih", "Tutar"]}
+
+
+@pytest.fixture
+def depo():
+    d = SqliteDepo(":memory:", SEMA)
+    d.satir_ekle("Ogrenci_Data", [["Ali", "5"], ["Ayşe", "3"], ["Can", "8"]])
+    return d
+
+
+def test_oku_basligi_ve_satirlari_dondurur(depo):
+    assert depo.oku("Ogrenci_Data") == [["Ad Soyad", "Kalan Ders"], ["Ali", "5"], ["Ayşe", "3"], ["Can", "8"]]
+    assert depo.oku("Yok") is None
+
+
+def test_oku_kuyruk_veri_satiri_ofsetinden_baslar(depo):
+    assert depo.oku_kuyruk("Ogrenci_Data", 1) == [["Ayşe", "3"], ["Can", "8"]]
+    assert depo.oku_kuyruk("Ogrenci_Data", 3) == []
+    assert depo.oku_kuyruk("Yok", 0) == []
+
+
+def test_eksik_hucreler_bos_okunur(depo):
+    depo.satir_ekle("Finans_Kasa", [["2026-01-01"]])
+    assert depo.oku("Finans_Kasa")[1] == ["2026-01-01", ""]
+
+
+def test_hucre_guncelle_konuma_gore(depo):
+    depo.hucre_guncelle("Ogrenci_Data", {(1, 1): "2", (2, 0): "Cem"})
+    assert depo.oku("Ogrenci_Data")[1:] == [["Ali", "5"], ["Ayşe", "2"], ["Cem", "8"]]
+
+
+def test_satir_sil_konuma_gore(depo):
+    depo.satir_sil("Ogrenci_Data", [0, 2, 2])
+    assert depo.oku("Ogrenci_Data")[1:] == [["Ayşe", "3"]]
+    # Silmeden sonra konumlar yeniden sıralanır
+    depo.hucre_guncelle("Ogrenci_Data", {(0, 1): "1"})
+    assert depo.hucreleri_oku("Ogrenci_Data", [(0, 1), (1, 0)]) == {(0, 1): "1", (1, 0): ""}
+
+
+def test_sayfa_kur_tabloyu_degistirir(depo):
+    depo.sayfa_kur("Ogrenci_Data", ["Ad Soyad", "Seviye", "Kalan Ders"], [["Deniz", "A", "4"]])
+    assert depo.oku("Ogrenci_Data") == [["Ad Soyad", "Seviye", "Kalan Ders"], ["Deniz", "A", "4"]]
+    depo.sayfa_kur("Arsiv_2025", ["Tarih"], [["2025-12-31"]])
+    assert "Arsiv_2025" in depo.sayfa_listesi()
+    assert depo.oku("Arsiv_2025") == [["Tarih"], ["2025-12-31"]]
+
+
+# --- SheetsDepo (sahte tablo üzerinde) ---
+@pytest.fixture
+def tablo():
+    t = SahteTablo()
+    t.yukle("Ders_Gecmisi", [["Tarih"]] + [[str(i)] for i in range(10)])
+    t.yukle("Ogrenci_Data", [["Ad Soyad"], ["Ali"]])
+    return t
+
+
+def _gonderilen(tablo):
+    # tablo.batch_update'e giden istek gövdelerini kaydeder
+    govdeler, asil = [], tablo.batch_update
+    tablo.batch_update = lambda govde: (govdeler.append(govde), asil(govde))[1]
+    return govdeler
+
+
+def test_satir_sil_ardisik_satirlari_birlestirir_alttan_siler(tablo):
+    govdeler = _gonderilen(tablo)
+    SheetsDepo(tablo).satir_sil("Ders_Gecmisi", [1, 2, 3, 6, 8, 8])
+    assert len(govdeler) == 1
+    araliklar = [(i["deleteDimension"]["range"]["startIndex"], i["deleteDimension"]["range"]["endIndex"]) for i in govdeler[0]["requests"]]
+    assert araliklar == [(9, 10), (7, 8), (2, 5)]  # başlık satırı yüzünden +1
+    assert tablo.sayfalar["Ders_Gecmisi"].satirlar == [["Tarih"], ["0"], ["4"], ["5"], ["7"], ["9"]]
+
+
+def test_semalari_kur_eskiyi_adlandirir_yeniyi_ekler_eskiyi_siler(tablo):
+    govdeler = _gonderilen(tablo)
+    SheetsDepo(tablo).semalari_kur({"Ders_Gecmisi": (["Tarih", "Saat"], [["1", "2"]]), "Finans_Kasa": (["Tarih"], [])})
+    assert len(govdeler) == 1
+    turler = [next(iter(i)) for i in govdeler[0]["requests"]]
+    assert turler == ["updateSheetProperties", "addSheet", "updateCells", "addSheet", "updateCells", "deleteSheet"]
+    assert tablo.sayfalar["Ders_Gecmisi"].satirlar == [["Tarih", "Saat"], ["1", "2"]]
+    assert tablo.sayfalar["Finans_Kasa"].satirlar == [["Tarih"]]
+    assert sorted(tablo.sayfalar) == ["Ders_Gecmisi", "Finans_Kasa", "Ogrenci_Data"]
+
+
+def _basarisiz(*kodlar):
+    # Sırayla verilen kodlarla APIError fırlatır, sonra "tamam" döner
+    kalan = list(kodlar)
+    def istek():
+        istek.sayi += 1
+        if kalan: raise gspread.exceptions.APIError(_Cevap(kalan.pop(0), "hata", "HATA"))
+        return "tamam"
+    istek.sayi = 0
+    return istek
+
+
+@pytest.fixture
+def beklemesiz(monkeypatch):
+    monkeypatch.setattr(depo_modulu.time, "sleep", lambda s: None)
+
+
+def test_okuma_429_ve_5xx_de_tekrarlanir(beklemesiz):
+    istek = _basarisiz(429, 503, 500)
+    assert SheetsDepo(None)._oku(istek) == "tamam" and istek.sayi == 4
+
+
+def test_yazma_sadece_429_da_tekrarlanir(beklemesiz):
+    istek = _basarisiz(429)
+    assert SheetsDepo(None)._yaz(istek) == "tamam" and istek.sayi == 2
+    istek = _basarisiz(503)
+    with pytest.raises(gspread.exceptions.APIError): SheetsDepo(None)._yaz(istek)
+    assert istek.sayi == 1
+
+
+def test_tekrar_sayisi_asilinca_hata_cikar(beklemesiz):
+    istek = _basarisiz(*[429] * 3)
+    with pytest.raises(gspread.exceptions.APIError): SheetsDepo(None, deneme=3)._oku(istek)
+    assert istek.sayi == 3
+
+
+def test_kota_siniri_kova_bitince_bekler(monkeypatch):
+    saat, beklemeler = [100.0], []
+    def uyu(s): beklemeler.append(s); saat[0] += s
+    monkeypatch.setattr(depo_modulu.time, "monotonic", lambda: saat[0])
+    monkeypatch.setattr(depo_modulu.time, "sleep", uyu)
+    sinir = KotaSiniri(2, sure=1.0)  # saniyede 2 jeton
+    sinir.al(); sinir.al()
+    assert beklemeler == []
+    sinir.al()
+    assert beklemeler == [pytest.approx(0.5)]
+    saat[0] += 10  # kova kapasitesinden fazla dolmaz
+    sinir.al(); sinir.al(); sinir.al()
+    assert len(beklemeler) == 2
+
+
+# --- AnlikDepo (sahte tablo + geçici dizin) ---
+@pytest.fixture
+def anlik(tablo, tmp_path):
+    pytest.importorskip("pyarrow")
+    d = AnlikDepo(lambda: SheetsDepo(tablo), tmp_path, SADECE_EKLENEN)
+    d.esitle()
+    return d
+
+
+def _araliklar(tablo):
+    # values_batch_get'e giden aralık listeleri
+    istenen, asil = [], tablo.values_batch_get
+    tablo.values_batch_get = lambda araliklar, params=None: (istenen.append(list(araliklar)), asil(araliklar))[1]
+    return istenen
+
+
+def _goruntu(anlik, ad):
+    return [[h for h in r.values()] for r in anlik._oku_anlik(ad).to_pylist()]
+
+
+def test_esitle_defterde_sadece_kuyrugu_ceker(anlik, tablo):
+    istenen = _araliklar(tablo)
+    tablo.sayfalar["Ders_Gecmisi"].satirlar += [["10"], ["11"]]
+    assert anlik.esitle() == ["Ders_Gecmisi"]
+    assert istenen == [["'Ders_Gecmisi'!A11:T", "'Ogrenci_Data'"]]  # son bilinen satırdan (10. veri satırı) itibaren
+    assert _goruntu(anlik, "Ders_Gecmisi") == tablo.sayfalar["Ders_Gecmisi"].satirlar
+
+
+def test_esitle_silinen_satiri_fark_edip_bastan_okur(anlik, tablo):
+    istenen = _araliklar(tablo)
+    ws = tablo.sayfalar["Ders_Gecmisi"]
+    del ws.satirlar[1:4]
+    ws.satirlar.append(["ozet"])
+    assert anlik.esitle() == ["Ders_Gecmisi"]
+    assert istenen[-1] == ["'Ders_Gecmisi'"]
+    assert _goruntu(anlik, "Ders_Gecmisi") == ws.satirlar
+
+
+def test_tam_esitleme_kuyruk_eklenmis_dosyayi_yeniden_yazmaz(anlik, tablo):
+    tablo.sayfalar["Ders_Gecmisi"].satirlar.append(["10"])
+    anlik.esitle()
+    durum = anlik._durum("Ders_Gecmisi")
+    assert anlik.esitle(tam=True) == []
+    assert anlik._durum("Ders_Gecmisi") == durum
+
+
+def test_kosullu_esitleme_araya_giren_yaziyi_ezmez(anlik, tablo, tmp_path):
+    yenileyici = AnlikDepo(lambda: SheetsDepo(tablo), tmp_path, SADECE_EKLENEN)
+    anlik.satir_ekle("Ogrenci_Data", [["Veli"]])
+    kaynak = anlik.kaynak()
+    asil = kaynak.toplu_oku
+    def gecikmeli(istekler):
+        # Bu süreç okuduktan sonra tablo değişir ve yenileyici daha yeni görüntüyü yazar
+        sonuc = asil(istekler)
+        tablo.sayfalar["Ogrenci_Data"].satirlar.append(["Can"])
+        yenileyici.esitle()
+        return sonuc
+    kaynak.toplu_oku = gecikmeli
+    anlik.esitle(["Ogrenci_Data"], kosullu=True)
+    assert _goruntu(anlik, "Ogrenci_Data") == [["Ad Soyad"], ["Ali"], ["Veli"], ["Can"]]
+    assert "Ogrenci_Data" in anlik.kirli  # kendi okuması yazılmadı, bir sonraki okumada tekrar denenir
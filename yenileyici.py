@@ -0,0 +1,50 @@
+# --- ANLIK GÖRÜNTÜ YENİLEYİCİ ---
+# Birden çok Streamlit kopyası aynı COURTMASTER_ANLIK dizinini paylaşırken Sheets'i sadece bu
+# süreç izler: her turda tablonun revizyonuna (Drive modifiedTime) bakar, değiştiyse sayfaları
+# tek istekle çeker ve içeriği değişen sayfaların Arrow dosyalarını yeniden yazar. Defterlerden
+# (SADECE_EKLENEN) sadece yeni satırlar çekilip dosyanın sonuna eklenir; --tam-aralik'ta bir
+# hepsi baştan okunur. Kopya sayısı artsa da Sheets trafiği sabit kalır.
+#
+#   COURTMASTER_ANLIK=/var/cache/courtmaster python yenileyici.py --aralik 10
+import argparse
+import os
+import time
+import tomllib
+from datetime import datetime
+
+from depo import SADECE_EKLENEN, AnlikDepo, SheetsDepo, tablo_ac
+
+def baglanti_kur():
+    # app.py ile aynı kimlik bilgileri: .streamlit/secrets.toml, yoksa secrets.json
+    if os.path.exists(".streamlit/secrets.toml"):
+        with open(".streamlit/secrets.toml", "rb") as f: return tablo_ac(tomllib.load(f)["gcp_service_account"])
+    return tablo_ac('secrets.json')
+
+def main():
+    p = argparse.ArgumentParser(description="Paylaşılan Sheets görüntülerini günceller")
+    p.add_argument("--dizin", default=os.environ.get("COURTMASTER_ANLIK"), help="görüntü dizini (varsayılan COURTMASTER_ANLIK)")
+    p.add_argument("--aralik", type=float, default=10, help="revizyon kontrol aralığı (sn)")
+    p.add_argument("--tam-aralik", type=float, default=300, help="defterlerin de baştan okunma aralığı (sn)")
+    p.add_argument("--bir-kez", action="store_true", help="tek tur eşitleyip çık")
+    args = p.parse_args()
+    if not args.dizin: p.error("--dizin ya da COURTMASTER_ANLIK gerekli")
+
+    depo = AnlikDepo(lambda: SheetsDepo(baglanti_kur()), args.dizin, SADECE_EKLENEN)
+    son, son_tam = None, float("-inf")
+    while True:
+        try:
+            # Revizyon indirmeden önce alınır: indirme sırasında gelen değişiklik bir sonraki turda görülür
+            revizyon = depo.revizyon()
+            if revizyon is None or revizyon != son:
+                tam = time.monotonic() - son_tam >= args.tam_aralik
+                degisen = depo.esitle(tam=tam)
+                son = revizyon
+                if tam: son_tam = time.monotonic()
+                print(f"{datetime.now():%H:%M:%S} revizyon {revizyon}: {', '.join(degisen) or 'içerik aynı'}", flush=True)
+        except Exception as e:
+            print(f"{datetime.now():%H:%M:%S} hata: {e}", flush=True)
+        if args.bir_kez: break
+        time.sleep(args.aralik)
+
+if __name__ == "__main__":
+    main()